@@ -0,0 +1,148 @@
+#!/usr/bin/python
+
+"""
+    Tokens per second of colorize.StreamParser, with the fragments written one by one ( bufsize = 0 )
+    and buffered, for three kinds of output: a file, a pipe ( unbuffered, as stdout to a pager may be )
+    and an in-memory cStringIO
+
+    usage:
+
+        python bench_colorize.py [ --bufsize 0,4096,65536 ] [ --repeat N ] [ file.py ... ]
+
+    ( by default, the corpus is the .py files of the standard library directory )
+"""
+
+import glob
+import optparse
+import os
+import sys
+import tempfile
+import threading
+import tokenize
+
+from cStringIO import StringIO
+from time import time
+
+import colorize
+
+
+## --------------------------------------------------------------------------
+
+def _corpus( paths, repeat ):
+    """ one big source text, the given files ( repeated ) one after another """
+
+    parts = []
+    for path in paths :
+        f = open( path )
+        try:
+            parts.append( f.read() )
+        finally:
+            f.close()
+
+    return ''.join( parts ) * repeat
+
+
+def _tokens( text ):
+    """ the number of tokens in the text """
+
+    count = [ 0 ]
+    def eat( *args ): count[0] += 1
+
+    tokenize.tokenize( StringIO( text ).readline, eat )
+    return count[0]
+
+
+## --------------------------------------------------------------------------
+
+#
+# the outputs
+#
+
+def _file_sink():
+
+    fd, path = tempfile.mkstemp( suffix = '.html' )
+    os.close( fd )
+    out = open( path, 'w' )
+
+    def close():
+        out.close()
+        os.remove( path )
+
+    return out, close
+
+
+def _pipe_sink():
+    """ an unbuffered pipe, drained by a thread """
+
+    r, w = os.pipe()
+
+    def drain():
+        while os.read( r, 65536 ):
+            pass
+
+    thread = threading.Thread( target = drain )
+    thread.setDaemon( True )
+    thread.start()
+
+    out = os.fdopen( w, 'w', 0 )
+
+    def close():
+        out.close()
+        thread.join()
+        os.close( r )
+
+    return out, close
+
+
+def _memory_sink():
+
+    out = StringIO()
+    return out, out.close
+
+
+_sinks = (
+    ( 'file', _file_sink ),
+    ( 'pipe', _pipe_sink ),
+    ( 'memory', _memory_sink ),
+)
+
+
+## --------------------------------------------------------------------------
+
+def run( text, ntokens, bufsizes, out = sys.stdout ):
+    """ prints and returns { ( sink, bufsize ) : tokens per second } """
+
+    results = {}
+    for name, sink in _sinks :
+        for bufsize in bufsizes :
+            output, close = sink()
+
+            t0 = time()
+            colorize.StreamParser( StringIO( text ), output, bufsize = bufsize ).output()
+            output.flush()
+            elapsed = time() - t0
+
+            close()
+
+            results[ ( name, bufsize ) ] = rate = ntokens / elapsed
+            print >>out, "%-8s bufsize %-8d %12.0f tokens/s" % ( name, bufsize, rate )
+            out.flush()
+
+    return results
+
+
+if __name__ == '__main__' :
+
+    parser = optparse.OptionParser( usage = "%prog [ --bufsize N,N ... ] [ --repeat N ] [ file.py ... ]" )
+    parser.add_option( '--bufsize', default = '0,%d' % ( colorize._bufsize, ), help = "comma-separated buffer sizes [%default]" )
+    parser.add_option( '--repeat', type = 'int', default = 1, help = "repeat the corpus N times [%default]" )
+    options, paths = parser.parse_args()
+
+    if not paths :
+        paths = sorted( glob.glob( os.path.join( os.path.dirname( os.__file__ ), '*.py' ) ) )
+
+    text = _corpus( paths, options.repeat )
+    ntokens = _tokens( text )
+    print >>sys.stderr, "%d files, %.1f MB, %d tokens" % ( len( paths ), len( text ) / 1e6, ntokens )
+
+    run( text, ntokens, [ int( size ) for size in options.bufsize.split( ',' ) ] )
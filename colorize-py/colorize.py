@@ -20,17 +20,19 @@ _colors = {
     _TEXT:              'black',
 }
 
+_bufsize = 65536 # the output goes in chunks of about this size ( 0: a write per fragment )
+
 _fontsize = 1.2 # "*100%"
 _fontsize_str = str(  int( _fontsize * 100 )  ) + '%' # 1.1 => '110%'
 
 class Parser:
     """ Colorize python source"""
     
-    def __init__( self, raw, output = sys.stdout, color_mapping = _colors ):
+    def __init__( self, raw, output = sys.stdout, color_mapping = _colors, bufsize = _bufsize ):
         """ Store the source text"""
         
         self._colors = color_mapping
-        self._outfile = output
+        self._init_output(output, bufsize)
         
         self._raw = string.strip(string.expandtabs(raw))
         
@@ -55,7 +57,35 @@ class Parser:
         except tokenize.TokenError, ex:
             msg = ex[0]
             line = ex[1][0]
+            self._flush()
             print "ERROR: %s %s" % (msg, self._raw[self.lines[line]:])
+        self._flush()
+
+    def _init_output(self, output, bufsize):
+        """ Fragments go to a list, joined and written every 'bufsize' characters ( bufsize = 0: written one by one )"""
+        
+        self._outfile = output
+        self._bufsize = bufsize
+        self._buffer = []
+        self._buffered = 0
+        
+        if bufsize:
+            self._write = self._append
+        else:
+            self._write = output.write
+
+    def _append(self, text):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self._bufsize:
+            self._flush()
+
+    def _flush(self):
+        """ Write out what is buffered"""
+        if self._buffer:
+            self._outfile.write(''.join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
 
     def __call__(self, toktype, toktext, (srow,scol), (erow,ecol), line):
         """ Token handler"""
@@ -66,18 +96,23 @@ class Parser:
 
         # handle newlines
         if toktype in [token.NEWLINE, tokenize.NL]:
-            self._outfile.write('\n')
+            self._write('\n')
             return
 
         # send the original whitespace, if needed
         if newpos > oldpos:
-            self._outfile.write(self._raw[oldpos:newpos])
+            self._write(self._raw[oldpos:newpos])
 
         # skip indenting tokens
         if toktype in [token.INDENT, token.DEDENT]:
             self.pos = newpos
             return
 
+        self._emit(toktype, toktext)
+
+    def _emit(self, toktype, toktext):
+        """ Send a token's text, colored"""
+        
         # map token type to a color group
         if token.LPAR <= toktype and toktype <= token.OP:
             toktype = token.OP
@@ -88,13 +123,88 @@ class Parser:
         # send text
         toktext = cgi.escape(toktext)
         if not color:
-            if toktext: self._outfile.write(toktext)
+            if toktext: self._write(toktext)
         elif color == 'black':
-            if toktext: self._outfile.write('<b>%s</b>' % (toktext))
+            if toktext: self._write('<b>%s</b>' % (toktext))
 
         else: # [ http://www.w3schools.com/tags/att_font_color.asp ]
-            if toktext: self._outfile.write('<b style="color:%s">%s</b>'
-                                         % (color, toktext))
+            if toktext: self._write('<b style="color:%s">%s</b>'
+                                    % (color, toktext))
+
+
+class StreamParser(Parser):
+    """ Colorize python source read line by line: the memory does not grow with the file size
+    
+        ( only the current line is kept, and the output is written as the tokens come ;
+          unlike Parser, only the leading blank lines are stripped, not the leading/trailing whitespace )
+    """
+    
+    def __init__( self, infile, output = sys.stdout, color_mapping = _colors, bufsize = _bufsize ):
+        """ Store the file to read"""
+        
+        self._colors = color_mapping
+        self._init_output(output, bufsize)
+        
+        self._infile = infile
+        self._started = False # the leading blank lines are skipped
+        
+    def _readline(self):
+        """ The next line for the tokenizer, with the tabs expanded"""
+        
+        line = self._infile.readline()
+        while not self._started and line and not line.strip():
+            line = self._infile.readline()
+        self._started = True
+        
+        return string.expandtabs(line)
+        
+    def output(self):
+        """ Parse and send the colored source, as it is read."""
+        
+        # where the previous token ended, and the rest of its ( last ) line
+        self.row, self.col = 1, 0
+        self.tail = ''
+        self.newline = True
+        
+        try:
+            tokenize.tokenize(self._readline, self) # uses self.__call__() 
+        except tokenize.TokenError, ex:
+            msg = ex[0]
+            line = ex[1][0]
+            self._flush()
+            print "ERROR: %s at line %d" % (msg, line)
+        self._flush()
+            
+    def __call__(self, toktype, toktext, (srow,scol), (erow,ecol), line):
+        """ Token handler"""
+        
+        # skip indenting tokens ( the indentation goes as the whitespace before the next token )
+        if toktype in [token.INDENT, token.DEDENT]:
+            return
+            
+        # the original whitespace: on the same line, or after a backslash continuation 
+        if srow == self.row:
+            space = line[self.col:scol]
+        elif self.newline:
+            space = line[:scol]
+        else:
+            space = self.tail + line[:scol]
+            
+        # remember the end ( 'line' has all the lines of a multi-line token, the last one is ours )
+        self.row, self.col = erow, ecol
+        self.tail = line[line.rfind('\n', 0, len(line) - 1) + 1:][ecol:]
+        self.newline = toktype in [token.NEWLINE, tokenize.NL]
+        
+        # handle newlines ( the whitespace before them is dropped, as in Parser )
+        if self.newline:
+            self._write('\n')
+            return
+            
+        if space:
+            self._write(space)
+            
+        self._emit(toktype, toktext)
+        
 
 if __name__ == "__main__":
     import sys
@@ -119,7 +229,7 @@ if __name__ == "__main__":
     ## self._outfile=outfile
     
     print >>outfile, '<pre style="font-size:%s">' % (_fontsize_str, )    
-    Parser(infile.read(), outfile).output()
+    StreamParser(infile, outfile).output()
     print >>outfile, '</pre>'
 
     infile.close()
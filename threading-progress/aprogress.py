@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+
+"""
+
+    An asyncio flavour of the 'progress' module: no thread and no lock --
+    -- the function is called from the event loop ( a loop.call_at() chain ),
+    and the values are plain attributes, as only the loop's thread writes them .
+
+    ( Python 3 only, as asyncio is )
+
+    Usage:
+
+    def print_progress( count, total ): ...
+
+    async def main():
+
+        reporter = AsyncProgress( print_progress, sleep = 1 )
+        reporter.total = len( urls )
+
+        async with reporter: # starts the reports; the final one is done on exit
+            async for response in reporter._wrap( fetch_all( urls ), 'count' ):
+                ...
+
+    The function may also be a coroutine function; then a report that is still running
+    when the next one is due makes the next one skipped .
+
+"""
+
+import asyncio
+import inspect
+import sys
+
+
+## --------------------------------------------------------------------------
+
+#
+# our exceptions
+#
+
+class Error( Exception ):
+    """ Argument of wrong type or value, or a run-time error """
+
+class TypeError( TypeError, Error ): pass
+class ValueError( ValueError, Error ): pass
+
+
+## --------------------------------------------------------------------------
+
+class AsyncProgress :
+
+    """ calls a given function (with given args) periodically from the running event loop ;
+
+        the restrictions for the function are the same as for progress.Progress:
+        a Python function (or a coroutine function) with a fixed number of arguments,
+        and its argument names should not start with an '_' or collide with the attribute names of this class .
+    """
+
+    def __init__( self, func, sleep = 1 ):
+
+        if not inspect.isfunction( func ):
+            raise TypeError( "only Python functions are accepted [received function argument of type '%s']" % ( type( func ), ) )
+
+        argnames = []
+        for param in inspect.signature( func ).parameters.values():
+
+            if param.kind in ( param.VAR_POSITIONAL, param.VAR_KEYWORD, param.KEYWORD_ONLY ):
+                raise ValueError( "only Python functions with a fixed number of positional arguments are accepted [got '%s']" % ( param, ) )
+
+            if param.name.startswith( '_' ) or hasattr( AsyncProgress, param.name ):
+                raise ValueError( "the function argument name '%s' is reserved; an argument name can not start with an '_' or be in the following list: %s" % ( param.name, dir( AsyncProgress ) ) )
+
+            argnames.append( param.name )
+
+            # the defaults are the initial values, the rest are None
+            setattr( self, param.name, None if param.default is param.empty else param.default )
+
+        self._func = func
+        self._argnames = tuple( argnames )
+        self._interval = sleep
+
+        self._loop = None
+        self._handle = None # the next loop.call_at()
+        self._deadline = None
+        self._pending = None # a report of a coroutine function that is still running
+        self._finished = False
+
+    def _report( self ):
+        """ call the function once ( or start it, for a coroutine function ) """
+
+        if self._pending is not None and not self._pending.done():
+            return # still busy with the previous one
+
+        try:
+            ret = self._func( *[ getattr( self, name ) for name in self._argnames ] )
+            if inspect.isawaitable( ret ):
+                self._pending = asyncio.ensure_future( ret )
+                self._pending.add_done_callback( self._check )
+
+        except Exception as e: # trying to handle most of them
+            print( "progress function caused an exception (will be ignored): '%s'" % ( e, ), file = sys.stderr )
+
+    @staticmethod
+    def _check( future ):
+
+        if not future.cancelled() and future.exception() is not None:
+            print( "progress function caused an exception (will be ignored): '%s'" % ( future.exception(), ), file = sys.stderr )
+
+    def _tick( self ):
+
+        self._report()
+
+        # the same "in phase" deadlines as in progress._CallPeriodically
+        interval = self._interval
+        self._deadline += interval
+        now = self._loop.time()
+        if self._deadline < now :
+            self._deadline += ( ( now - self._deadline ) // interval + 1 ) * interval
+
+        self._handle = self._loop.call_at( self._deadline, self._tick )
+
+    def _start_once( self ):
+        """ on the first call, schedules the reports on the running loop; then does nothing """
+
+        if self._loop is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._deadline = self._loop.time()
+        self._handle = self._loop.call_soon( self._tick )
+
+    def _done( self ):
+        """ stop the reports and do the final one ( if it is a coroutine, _join() waits for it ) """
+
+        if self._finished :
+            return
+
+        self._finished = True
+        if self._handle is not None :
+            self._handle.cancel()
+
+        self._pending = None # the final report goes anyway
+        self._report()
+
+    async def _join( self ):
+        """ _done(), then wait for the final report """
+
+        self._done()
+        if self._pending is not None :
+            await asyncio.wait( [ self._pending ] )
+
+    async def __aenter__( self ):
+
+        self._start_once()
+        return self
+
+    async def __aexit__( self, *args ):
+
+        await self._join()
+
+    async def _wrap( self, aiterable, name = None ):
+        """ yields the items of an async iterable, storing the number of items so far to the field 'name' ( the first argument, by default ) ,
+            and starts the reports ( as progress.Progress._wrap() does; the final one is still up to _join() or 'async with' )
+        """
+
+        if name is None :
+            name = self._argnames[ 0 ]
+
+        self._start_once()
+
+        count = 0
+        async for item in aiterable :
+            count += 1
+            setattr( self, name, count )
+            yield item
+
+
+## --------------------------------------------------------------------------
+## --------------------------------------------------------------------------
+
+# a test
+if __name__ == '__main__' :
+
+    N = 5
+
+    def func( a = 0, b = N ): print( "\tprogress: ", a, b, file = sys.stderr )
+
+    async def items():
+        for i in range( N ):
+            # do hard work
+            await asyncio.sleep( 0.5 )
+            yield i
+
+    async def main():
+
+        p = AsyncProgress( func, sleep = 0.2 )
+        async with p:
+            async for i in p._wrap( items() ):
+                print( 'got item %d' % ( i, ), file = sys.stderr )
+
+    asyncio.run( main() )
@@ -0,0 +1,439 @@
+#!/usr/bin/python
+
+"""
+
+    Measurements of what a Progress costs, for the 'progress' and 'progress2' modules
+    ( not a unit test, just numbers to look at -- and to compare between revisions )
+
+    usage:
+
+        python bench_progress.py [ --json results.json ] [ --only name,name ... ]
+
+    the names ( see _benchmarks ) :
+
+        update      -- ns per 'reporter.count = i', without and with 'with reporter:' ( and with 'instrument' )
+        wrap        -- ns per item of a bare loop, of one with 'with reporter: reporter.count = i', and of one over reporter._wrap()
+        construct   -- us per Progress(), and the number of distinct classes made
+        contention  -- updates per second with 1 .. 16 writer threads, locked and sharded
+        blocked     -- how long a slow (200 ms) callback blocks a worker ( the waits over 10 ms ), with and without 'snapshot'
+        shutdown    -- ms for _join() with a 1 s interval
+        instances   -- memory, threads and wake-ups for 10 .. 1000 Progress objects, own threads and shared
+        backend     -- a CPU-bound worker's loops per second: no Progress, a reporter thread, the SIGALRM timer
+
+    with --json, the results go to a file as { "module" : { "metric" : value } }, plus some context
+"""
+
+import json
+import optparse
+import os
+import platform
+import sys
+import threading
+
+from time import time, sleep
+
+import progress
+import progress2
+
+_modules = ( progress, progress2 )
+
+
+## --------------------------------------------------------------------------
+
+#
+# construction: a NamedList ( and, for 'progress', a class ) per Progress
+#
+
+def construction( module, n = 2000 ):
+    """ returns ( Progress objects made per second, the number of distinct classes among them ) """
+
+    def func( count = 0, total = 0 ): pass
+
+    t0 = time()
+    progresses = [ module.Progress( func, start_now = False ) for i in xrange( n ) ]
+    elapsed = time() - t0
+
+    return n / elapsed, len( set( type( p ) for p in progresses ) )
+
+
+## --------------------------------------------------------------------------
+
+#
+# the cost of the attribute forwarding itself: descriptors ('progress') against __setattr__ ('progress2')
+#
+
+def attribute_updates( module, n = 200000 ):
+    """ returns 'reporter.count = i' updates per second ( no lock, one thread ) """
+
+    def func( count = 0, total = 0 ): pass
+
+    p = module.Progress( func, start_now = False )
+
+    t0 = time()
+    for i in xrange( n ):
+        p.count = i
+    elapsed = time() - t0
+
+    p._join()
+
+    return n / elapsed
+
+
+def locked_updates( module, n = 200000, instrument = False ):
+    """ returns 'with reporter: reporter.count = i' updates per second ( one thread, so no contention ) """
+
+    def func( count = 0, total = 0 ): pass
+
+    p = module.Progress( func, start_now = False, instrument = instrument )
+
+    t0 = time()
+    for i in xrange( n ):
+        with p:
+            p.count = i
+    elapsed = time() - t0
+
+    p._join()
+
+    return n / elapsed
+
+
+## --------------------------------------------------------------------------
+
+#
+# counting the items of a loop: by hand, under the lock, against Progress._wrap()
+#
+
+def wrap_overhead( module, n = 1000000 ):
+    """ returns ns per item for ( a bare loop, 'with p: p.count = i' per item, 'for i in p._wrap(...)' ) """
+
+    def func( count = 0 ): pass
+
+    t0 = time()
+    for i in xrange( n ):
+        pass
+    bare = time() - t0
+
+    p = module.Progress( func )
+    t0 = time()
+    for i in xrange( n ):
+        with p:
+            p.count = i
+    manual = time() - t0
+    p._join()
+
+    p = module.Progress( func )
+    t0 = time()
+    for i in p._wrap( xrange( n ) ):
+        pass
+    wrapped = time() - t0
+    p._join()
+
+    return bare * 1e9 / n, manual * 1e9 / n, wrapped * 1e9 / n
+
+
+## --------------------------------------------------------------------------
+
+#
+# how long are the workers blocked by a slow callback
+#
+
+def blocked_workers( module, snapshot, delay = 0.2, duration = 3, nthreads = 1, threshold = 0.01 ):
+    """ a callback sleeps 'delay' seconds (a slow terminal, say);
+        returns ( total seconds spent waiting for the lock per second, max single wait ) ;
+
+        only the waits over 'threshold' count as blocked: the rest is the cost of an uncontended 'with p:' ,
+        plus a GIL switch ( 5 ms at most ), that would add up to hundreds of ms per second otherwise
+    """
+
+    def slow( a = 0 ): sleep( delay )
+
+    p = module.Progress( slow, sleep = 0.1, snapshot = snapshot )
+
+    waits = []
+
+    def worker():
+
+        waited = 0.
+        longest = 0.
+
+        i = 0
+        stop = time() + duration
+        while time() < stop:
+
+            t0 = time()
+            with p:
+                t1 = time()
+                p.a = i
+
+            if t1 - t0 > threshold :
+                waited += t1 - t0
+            longest = max( longest, t1 - t0 )
+            i += 1
+
+        waits.append( (waited, longest) )
+
+    threads = [ threading.Thread( target = worker ) for i in xrange( nthreads ) ]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    p._done()
+
+    total = sum( w for w, l in waits ) / nthreads / duration
+    longest = max( l for w, l in waits )
+
+    return total, longest
+
+
+## --------------------------------------------------------------------------
+
+#
+# 'with p: p.count += 1' against the lock-free p._counter( 'count' ).add()
+#
+
+def counter_updates( module, sharded, nthreads, n = 100000 ):
+    """ returns updates per second, all threads together """
+
+    def func( count = 0 ): pass
+
+    p = module.Progress( func, counters = ( 'count', ) if sharded else () )
+
+    if sharded :
+        def worker():
+            add = p._counter( 'count' ).add
+            for i in xrange( n ):
+                add( 1 )
+    else:
+        def worker():
+            for i in xrange( n ):
+                with p:
+                    p.count += 1
+
+    threads = [ threading.Thread( target = worker ) for i in xrange( nthreads ) ]
+
+    t0 = time()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time() - t0
+
+    p._done()
+
+    return n * nthreads / elapsed
+
+
+## --------------------------------------------------------------------------
+
+#
+# how long does it take to stop a Progress ( including the final report )
+#
+
+def shutdown_latency( module, interval = 1 ):
+
+    def func( a = 0 ): pass
+
+    p = module.Progress( func, sleep = interval )
+    sleep( 0.1 ) # let the thread go to sleep
+
+    t0 = time()
+    p._join()
+
+    return time() - t0
+
+
+## --------------------------------------------------------------------------
+
+#
+# many Progress objects: a thread each against one shared scheduler thread
+#
+
+def _memory():
+    """ ( virtual, resident ) memory in kB, from /proc ( Linux only ) """
+
+    pagesize = os.sysconf( 'SC_PAGE_SIZE' ) / 1024
+    with open( '/proc/self/statm' ) as f:
+        size, resident = f.read().split()[:2]
+
+    return int( size ) * pagesize, int( resident ) * pagesize
+
+
+def many_instances( module, shared, n, interval = 0.1, duration = 2 ):
+    """ returns ( virtual kB, resident kB, threads, wake-ups per second ) for 'n' Progress objects """
+
+    def func( a = 0 ): pass
+
+    scheduler = module._scheduler()
+    wakeups = scheduler.wakeups
+
+    size, resident = _memory()
+    progresses = [ module.Progress( func, sleep = interval, shared = shared ) for i in xrange( n ) ]
+
+    sleep( duration )
+
+    size2, resident2 = _memory()
+    threads = threading.activeCount()
+
+    for p in progresses: p._join()
+
+    # the returns from select() ( or Condition.wait() ): the scheduler's, or the sum over the threads of our own
+    if shared :
+        wakeups = scheduler.wakeups - wakeups
+    else:
+        wakeups = sum( p._stats()[ 'wakeups' ] for p in progresses )
+
+    return size2 - size, resident2 - resident, threads, wakeups / float( duration )
+
+
+## --------------------------------------------------------------------------
+
+#
+# a CPU-bound single-threaded worker: a reporter thread competes for the GIL, a SIGALRM timer does not
+#
+
+def worker_throughput( module, backend, interval = 0.01, duration = 2 ):
+    """ returns loops per second of 'with p: p.count = i' plus a bit of work, for the 'backend': None, 'thread' or 'timer' """
+
+    def func( count = 0 ): pass
+
+    if backend is None :
+        p = None
+    else:
+        p = module.Progress( func, sleep = interval, timer = ( backend == 'timer' ) )
+
+    i = 0
+    stop = time() + duration
+    while True :
+        sum( xrange( 100 ) ) # the work
+
+        if p is not None :
+            with p:
+                p.count = i
+
+        i += 1
+        if i % 1000 == 0 and time() > stop :
+            break
+
+    if p is not None :
+        p._join()
+
+    return i / float( duration )
+
+
+## --------------------------------------------------------------------------
+
+#
+# the harness: every benchmark returns { metric : value } for a module
+#
+
+def _update( module ):
+
+    return { 'update_ns' : 1e9 / attribute_updates( module ),
+             'locked_update_ns' : 1e9 / locked_updates( module ),
+             'instrumented_update_ns' : 1e9 / locked_updates( module, instrument = True ) }
+
+def _wrap( module ):
+
+    bare, manual, wrapped = wrap_overhead( module )
+    return { 'loop_bare_ns' : bare, 'loop_locked_ns' : manual, 'loop_wrap_ns' : wrapped }
+
+def _construct( module ):
+
+    made, classes = construction( module )
+    return { 'construct_us' : 1e6 / made, 'construct_classes' : classes }
+
+def _contention( module ):
+
+    ret = {}
+    for nthreads in 1, 2, 4, 8, 16 :
+        ret[ 'locked_updates_per_s_%02d' % nthreads ] = counter_updates( module, False, nthreads )
+        ret[ 'sharded_updates_per_s_%02d' % nthreads ] = counter_updates( module, True, nthreads )
+    return ret
+
+def _blocked( module ):
+
+    ret = {}
+    for snapshot in False, True :
+        blocked, longest = blocked_workers( module, snapshot )
+        mode = 'snapshot' if snapshot else 'locked'
+        ret[ 'blocked_ms_per_s_%s' % mode ] = blocked * 1000
+        ret[ 'longest_wait_ms_%s' % mode ] = longest * 1000
+    return ret
+
+def _shutdown( module ):
+
+    return { 'shutdown_ms' : shutdown_latency( module ) * 1000 }
+
+def _instances( module ):
+
+    ret = {}
+    for n in 10, 100, 1000 :
+        for shared in False, True :
+            size, resident, threads, wakeups = many_instances( module, shared, n )
+            mode = 'shared' if shared else 'threads'
+            ret[ 'virtual_kb_%04d_%s' % (n, mode) ] = size
+            ret[ 'resident_kb_%04d_%s' % (n, mode) ] = resident
+            ret[ 'threads_%04d_%s' % (n, mode) ] = threads
+            ret[ 'wakeups_per_s_%04d_%s' % (n, mode) ] = wakeups
+    return ret
+
+def _backend( module ):
+
+    ret = {}
+    for backend in None, 'thread', 'timer' :
+        ret[ 'worker_loops_per_s_%s' % ( backend or 'none', ) ] = worker_throughput( module, backend )
+    return ret
+
+_benchmarks = (
+    ( 'update', _update ),
+    ( 'wrap', _wrap ),
+    ( 'construct', _construct ),
+    ( 'contention', _contention ),
+    ( 'blocked', _blocked ),
+    ( 'shutdown', _shutdown ),
+    ( 'instances', _instances ),
+    ( 'backend', _backend ),
+)
+
+
+def run( modules = _modules, only = None, out = sys.stdout ):
+    """ returns { module name : { metric : value } }, printing the numbers as they come """
+
+    results = {}
+    for name, bench in _benchmarks :
+        if only and name not in only :
+            continue
+
+        for module in modules :
+            values = bench( module )
+            results.setdefault( module.__name__, {} ).update( values )
+
+            for metric in sorted( values ):
+                print >>out, "%-10s %-32s %12.1f" % ( module.__name__, metric, values[ metric ] )
+            out.flush()
+
+    return results
+
+
+## --------------------------------------------------------------------------
+
+if __name__ == '__main__' :
+
+    parser = optparse.OptionParser( usage = "%prog [ --json FILE ] [ --only NAME,NAME ... ]" )
+    parser.add_option( '--json', metavar = 'FILE', help = "save the results to FILE ( '-' for stdout )" )
+    parser.add_option( '--only', metavar = 'NAMES', help = "comma-separated: %s" % ( ','.join( name for name, bench in _benchmarks ), ) )
+    options, args = parser.parse_args()
+
+    only = options.only.split( ',' ) if options.only else None
+    results = run( only = only, out = sys.stderr if options.json == '-' else sys.stdout )
+
+    if options.json :
+        report = {
+            'python' : platform.python_version(),
+            'platform' : platform.platform(),
+            'time' : time(),
+            'results' : results,
+        }
+
+        if options.json == '-' :
+            json.dump( report, sys.stdout, indent = 1, sort_keys = True )
+        else:
+            with open( options.json, 'w' ) as f:
+                json.dump( report, f, indent = 1, sort_keys = True )
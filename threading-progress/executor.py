@@ -0,0 +1,290 @@
+#!/usr/bin/python
+
+"""
+
+    Progress of an executor's tasks: a wrapper around anything with the concurrent.futures .submit()
+    ( ThreadPoolExecutor, ProcessPoolExecutor, the 'futures' backport on Python 2 ... ) that counts the tasks,
+    keeps their latencies in a fixed-size histogram -- and is a Progress hook that reports it all :
+
+    import progress, executor
+
+    def print_progress( completed, failed, queued, p50, p99, backpressure ): ...
+
+    pool = executor.TrackedExecutor( ThreadPoolExecutor( 8 ) )
+    reporter = progress.Progress( print_progress, hooks = [ pool ] )
+
+    for item in items:
+        pool.submit( work, item )
+        if pool.backpressure: # the queue grows faster than the tasks complete
+            sleep( 0.1 )
+    pool.shutdown()
+    reporter._join()
+
+    The fields:
+
+        submitted, running, completed, failed -- the task counts ( failed: completed with an exception, or cancelled )
+        queued          -- submitted, but not started yet
+        p50, p99, latency_max -- seconds from submit() to done, over all the completed tasks
+        backpressure    -- True when, since the previous report, the queue grew by more tasks than completed
+
+    'running' needs to know when a task starts: for a thread pool, the function is wrapped to tell it;
+    a task of a process pool runs in another process ( and the wrapper, holding a lock, would not pickle ),
+    so there 'running' is estimated as min( in flight, 'workers' ) -- or left None without 'workers' ;
+    'wrap' is True for a ThreadPoolExecutor by default, and 'workers' is the executor's max_workers, if it tells .
+
+"""
+
+import threading
+
+from math import frexp
+
+try:
+    from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor # python 3.2+, or the 'futures' backport
+except ImportError:
+    _ThreadPoolExecutor = None
+
+from progress import _clock # monotonic, python 2 included ( see progress._clock_gettime() )
+
+
+## --------------------------------------------------------------------------
+
+#
+# an HDR-style histogram: log2 octaves, each split into linear sub-buckets
+#
+
+class _LatencyHistogram( object ):
+    """
+        Values from 'lowest' seconds up, with a relative error below 1 / 'sub' ;
+        fixed memory ( 'octaves' * 'sub' ints ), O(1) per value
+    """
+
+    __slots__ = ( 'lowest', 'sub', 'counts', 'count', 'max' )
+
+    def __init__( self, lowest = 1e-6, sub = 16, octaves = 40 ): # 1 us .. 2**40 us ( 12 days )
+
+        self.lowest = lowest
+        self.sub = sub
+        self.counts = [0] * ( octaves * sub )
+        self.count = 0
+        self.max = 0.
+
+    def add( self, seconds ):
+
+        units = seconds / self.lowest
+        if units < 1 :
+            index = 0
+        else:
+            mantissa, exponent = frexp( units ) # units == mantissa * 2 ** exponent, 0.5 <= mantissa < 1
+            index = ( exponent - 1 ) * self.sub + int( ( mantissa * 2 - 1 ) * self.sub )
+            index = min( index, len( self.counts ) - 1 )
+
+        self.counts[ index ] += 1
+        self.count += 1
+        if seconds > self.max :
+            self.max = seconds
+
+    def _upper( self, index ):
+        """ the upper bound of a bucket, in seconds """
+
+        octave, sub = divmod( index, self.sub )
+        return self.lowest * 2 ** octave * ( 1 + ( sub + 1 ) / float( self.sub ) )
+
+    def percentile( self, q ):
+        """ the value below which the 'q' share ( 0..1 ) of the values are ( to the bucket's precision ), None when empty """
+
+        counts = list( self.counts )
+        total = sum( counts )
+        if not total :
+            return None
+
+        need = q * total
+        seen = 0
+        for index, n in enumerate( counts ):
+            seen += n
+            if n and seen >= need :
+                return min( self._upper( index ), self.max )
+
+        return self.max
+
+
+## --------------------------------------------------------------------------
+
+class _Started( object ):
+    """ the function of a task, telling the tracker when it starts ( thread pools only: it is called in this process ) """
+
+    __slots__ = ( 'func', 'tracker' )
+
+    def __init__( self, func, tracker ):
+
+        self.func = func
+        self.tracker = tracker
+
+    def __call__( self, *args, **kwargs ):
+
+        self.tracker._started()
+        return self.func( *args, **kwargs )
+
+
+class TrackedExecutor:
+    """ wraps an executor ( see the module doc ); also a Progress hook """
+
+    names = ( 'submitted', 'running', 'completed', 'failed', 'queued', 'p50', 'p99', 'latency_max', 'backpressure' )
+
+    def __init__( self, executor, wrap = None, workers = None ):
+
+        if wrap is None : # only the functions of a thread pool run here; for any other, the wrapper would have to pickle
+            wrap = _ThreadPoolExecutor is not None and isinstance( executor, _ThreadPoolExecutor )
+
+        if workers is None :
+            workers = getattr( executor, '_max_workers', None )
+
+        self._executor = executor
+        self._wrap = wrap
+        self._workers = workers
+
+        self._lock = threading.Lock() # a done callback may come from any thread
+        self._latency = _LatencyHistogram()
+
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self._cancelled = 0
+
+        self.backpressure = False
+        self._last = None # ( queued, completed ) at the previous report
+
+    def submit( self, func, *args, **kwargs ):
+
+        if self._wrap :
+            func = _Started( func, self )
+
+        # counted before: a fast task may be done before submit() returns
+        with self._lock :
+            self.submitted += 1
+
+        start = _clock()
+        try:
+            future = self._executor.submit( func, *args, **kwargs )
+        except:
+            with self._lock : # not submitted after all ( e.g. a RuntimeError after shutdown() )
+                self.submitted -= 1
+            raise
+
+        future.add_done_callback( lambda future: self._done( future, start ) )
+
+        return future
+
+    def map( self, func, *iterables ):
+        """ like Executor.map(), without the 'timeout' and 'chunksize': all the tasks are submitted now, the results come in order """
+
+        futures = [ self.submit( func, *args ) for args in zip( *iterables ) ]
+
+        def results(): # a generator of its own: a 'yield' here would put off the submits to the first next()
+            for future in futures :
+                yield future.result()
+
+        return results()
+
+    def _started( self ):
+
+        with self._lock :
+            self.started += 1
+
+    def _done( self, future, start ):
+
+        elapsed = _clock() - start
+        cancelled = future.cancelled()
+        failed = cancelled or future.exception() is not None
+
+        with self._lock :
+            self.completed += 1
+            if cancelled : # never started
+                self._cancelled += 1
+            if failed :
+                self.failed += 1
+            else:
+                self._latency.add( elapsed )
+
+    def running( self ):
+        """ the tasks started and not done yet ( None when there is no way to tell ) """
+
+        if self._wrap :
+            return self.started - ( self.completed - self._cancelled )
+
+        if self._workers is not None :
+            return min( self.submitted - self.completed, self._workers )
+
+        return None
+
+    def __call__( self, fields, now ):
+
+        with self._lock :
+            submitted, completed, failed = self.submitted, self.completed, self.failed
+            running = self.running()
+            p50 = self._latency.percentile( 0.5 )
+            p99 = self._latency.percentile( 0.99 )
+            latency_max = self._latency.max if self._latency.count else None
+
+        queued = submitted - completed - ( running or 0 )
+
+        if self._last is not None :
+            last_queued, last_completed = self._last
+            self.backpressure = queued - last_queued > completed - last_completed
+        self._last = ( queued, completed )
+
+        fields.update( submitted = submitted, running = running, completed = completed, failed = failed,
+                       queued = queued, p50 = p50, p99 = p99, latency_max = latency_max, backpressure = self.backpressure )
+
+    def shutdown( self, wait = True ):
+
+        self._executor.shutdown( wait )
+
+    def __enter__( self ):
+
+        return self
+
+    def __exit__( self, *args ):
+
+        self.shutdown()
+
+
+## --------------------------------------------------------------------------
+## --------------------------------------------------------------------------
+
+# a test
+if __name__ == '__main__' :
+
+    import random
+    import sys
+    from time import sleep
+
+    try:
+        from concurrent.futures import ThreadPoolExecutor # python 3.2+, or the 'futures' backport
+    except ImportError:
+        print >>sys.stderr, "no concurrent.futures here ( pip install futures )"
+        sys.exit( 0 )
+
+    import progress
+
+    def func( submitted = 0, running = 0, completed = 0, failed = 0, queued = 0, p50 = None, p99 = None, backpressure = False ):
+        print >>sys.stderr, "\tprogress: %d submitted, %d running, %d queued, %d completed ( %d failed ), p50 %s, p99 %s%s" % (
+            submitted, running, queued, completed, failed, p50, p99, ' -- backpressure' if backpressure else '' )
+
+    def work( i ):
+        sleep( random.expovariate( 200 ) ) # 5 ms on average
+        if i % 50 == 0 :
+            raise ValueError( i )
+
+    pool = TrackedExecutor( ThreadPoolExecutor( 4 ) )
+    p = progress.Progress( func, sleep = 0.2, hooks = [ pool ] )
+
+    with pool :
+        for i in xrange( 1000 ):
+            pool.submit( work, i )
+            if i < 500 :
+                sleep( 0.0005 ) # faster than the pool: the queue grows
+            else:
+                sleep( 0.002 )
+
+    p._join()
@@ -0,0 +1,331 @@
+#!/usr/bin/python
+
+"""
+
+    Prometheus metrics for Progress objects: the fields of every registered Progress
+    ( the numeric ones ) plus the reporter's own statistics, in the text exposition format ,
+    written to a node-exporter "textfile" ( atomically ) and/or served over HTTP :
+
+    import progress, export
+
+    exporter = export.Exporter( textfile = '/var/lib/node_exporter/copy.prom' )
+    exporter.serve( 9465 ) # http://127.0.0.1:9465/metrics
+
+    reporter = progress.Progress( print_progress, snapshot = True )
+    exporter.register( reporter, 'copy' )
+
+    The metrics ( 'progress' is the 'prefix' ):
+
+        progress_<field>{progress="copy"}                   -- gauge, the last reported value of a field
+        progress_ticks_total{progress="copy"}               -- counter, the reports so far
+        progress_callback_seconds_total{progress="copy"}    -- counter, the time spent in the hooks and the function
+        progress_callback_last_seconds{progress="copy"}     -- gauge, the same for the last report
+        progress_interval_seconds{progress="copy"}          -- gauge, the reporting interval
+
+    ( the rates are left to the PromQL: rate( progress_count[1m] ) )
+
+    The values are published by a hook, i.e. by the periodic thread of the Progress itself ;
+    the hook copies the fields into the exporter's store ( that is all it does under the Progress lock ),
+    and a scrape reads only the store, under a lock of its own .
+
+    The textfile is written by a thread of the exporter, after every change of the store
+    ( the changes that come while it writes are written together, next ) ; .close() writes it the last time .
+
+"""
+
+import exceptions
+import numbers
+import os
+import sys
+import threading
+
+try:
+    import BaseHTTPServer as _http # python 2
+except ImportError:
+    import http.server as _http # python 3
+
+
+## --------------------------------------------------------------------------
+
+#
+# our exceptions
+#
+
+class Error(exceptions.Exception):
+    """ Argument of wrong type or value, or a run-time error """
+
+class ValueError( exceptions.ValueError, Error ): pass
+
+
+## --------------------------------------------------------------------------
+
+#
+# the text format
+#
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape( value ):
+    """ a label value, as in the exposition format """
+
+    return str( value ).replace( '\\', '\\\\' ).replace( '"', '\\"' ).replace( '\n', '\\n' )
+
+def _number( value ):
+    """ the value as a float, or None for what is not a number ( strings, lists, None ... ) """
+
+    if isinstance( value, numbers.Real ) : # bool included: True == 1.0
+        return float( value )
+
+    return None
+
+def _format( value ):
+
+    if value != value :
+        return 'NaN'
+    if value in ( float( 'inf' ), float( '-inf' ) ) :
+        return '+Inf' if value > 0 else '-Inf'
+
+    return repr( value )
+
+
+## --------------------------------------------------------------------------
+
+class _Publish:
+    """ the hook that copies the fields of one Progress into the Exporter """
+
+    def __init__( self, exporter, name, progress ):
+
+        self.__exporter = exporter
+        self.__name = name
+        self.__progress = progress
+
+    def __call__( self, fields, now ):
+
+        # the numbers only, so that nothing in the store refers to the worker's objects
+        values = {}
+        for field, value in fields.iteritems() :
+            value = _number( value )
+            if value is not None :
+                values[ field ] = value
+
+        self.__exporter._publish( self.__name, values, self.__progress._stats() )
+
+    def close( self ):
+
+        self.__exporter._publish_final( self.__name, self.__progress._stats() )
+
+
+class Exporter:
+    """
+        Keeps the last published values per registered Progress;
+        .text() renders them, .write() / a 'textfile' and .serve() publish the text
+    """
+
+    def __init__( self, prefix = 'progress', textfile = None ):
+
+        self._prefix = prefix
+        self._textfile = textfile
+
+        self._lock = threading.RLock() # guards the store only, never held while calling out ( an RLock: the hook may run in a signal handler, Progress( timer = True ) )
+        self._store = {} # name => ( { field : value }, stats )
+        self._server = None
+
+        self._changed = threading.Event() # the store changed since the writer's last write
+        self._writer = None # the textfile writer thread, started on the first change
+        self._closed = False
+
+    def register( self, progress, name ):
+        """ start publishing the fields of a Progress under the label progress="<name>" """
+
+        with self._lock :
+            if name in self._store :
+                raise ValueError( "the name '%s' is registered already" % ( name, ) )
+            self._store[ name ] = ( {}, progress._stats() )
+
+        progress._add_hook( _Publish( self, name, progress ) )
+
+    def _publish( self, name, values, stats ):
+
+        with self._lock :
+            self._store[ name ] = ( values, stats )
+
+        self._wake_writer()
+
+    def _publish_final( self, name, stats ):
+        """ the final report is over: the same fields, the stats that count it """
+
+        with self._lock :
+            values = self._store[ name ][ 0 ]
+            self._store[ name ] = ( values, stats )
+
+        self._wake_writer()
+
+    def _wake_writer( self ):
+        """ no file I/O in the hook ( it may run under the Progress lock ): the writer thread does it """
+
+        if self._textfile is None :
+            return
+
+        with self._lock :
+            if self._closed :
+                return
+
+            if self._writer is None :
+                self._writer = thread = threading.Thread( target = self._write_loop, name = 'progress-exporter-textfile' )
+                thread.setDaemon( True )
+                thread.start()
+
+        self._changed.set()
+
+    def _write_loop( self ):
+
+        while True :
+            self._changed.wait()
+            self._changed.clear() # before the write: a change while writing makes one more write
+
+            if self._closed :
+                return
+
+            try:
+                self.write()
+            except EnvironmentError, e :
+                print >>sys.stderr, "failed to write the metrics to '%s' (will retry on the next report): '%s'" % ( self._textfile, e, )
+
+    def text( self ):
+        """ all the metrics, in the text exposition format """
+
+        with self._lock : # a shallow copy: the dicts in the store are never changed, only replaced
+            store = sorted( self._store.items() )
+
+        prefix = self._prefix
+
+        fields = {} # field => [ ( name, value ) ]
+        for name, ( values, stats ) in store :
+            for field, value in values.iteritems() :
+                fields.setdefault( field, [] ).append( ( name, value ) )
+
+        out = []
+
+        def metric( metric, kind, help, samples ):
+            out.append( '# HELP %s %s\n' % ( metric, help ) )
+            out.append( '# TYPE %s %s\n' % ( metric, kind ) )
+            for name, value in samples :
+                out.append( '%s{progress="%s"} %s\n' % ( metric, _escape( name ), _format( value ) ) )
+
+        for field in sorted( fields ) :
+            metric( '%s_%s' % ( prefix, field ), 'gauge', 'the last reported value of \'%s\'' % ( field, ), fields[ field ] )
+
+        metric( prefix + '_ticks_total', 'counter', 'the reports so far',
+                [ ( name, stats[ 'ticks' ] ) for name, ( values, stats ) in store ] )
+        metric( prefix + '_callback_seconds_total', 'counter', 'the time spent in the hooks and the function',
+                [ ( name, stats[ 'callback_seconds' ] ) for name, ( values, stats ) in store ] )
+        metric( prefix + '_callback_last_seconds', 'gauge', 'the time spent in the hooks and the function, the last report',
+                [ ( name, stats[ 'last_callback' ] ) for name, ( values, stats ) in store ] )
+        metric( prefix + '_interval_seconds', 'gauge', 'the reporting interval',
+                [ ( name, stats[ 'interval' ] ) for name, ( values, stats ) in store ] )
+
+        return ''.join( out )
+
+    def write( self, path = None ):
+        """ write the text to 'path' ( the 'textfile' by default ) atomically: a temporary file in the same directory, then a rename """
+
+        if path is None :
+            path = self._textfile
+
+        text = self.text()
+
+        tmp = '%s.%d.%d.tmp' % ( path, os.getpid(), threading.current_thread().ident )
+        f = open( tmp, 'w' )
+        try:
+            f.write( text )
+        finally:
+            f.close()
+
+        os.rename( tmp, path ) # atomic on POSIX: a reader sees either the old or the new file
+
+    def serve( self, port, host = '127.0.0.1' ):
+        """ serve the text at http://host:port/metrics in a daemon thread; returns the ( host, port ) bound """
+
+        exporter = self
+
+        class Handler( _http.BaseHTTPRequestHandler ):
+
+            def do_GET( self ):
+
+                if self.path.split( '?' )[ 0 ] not in ( '/', '/metrics' ) :
+                    self.send_error( 404 )
+                    return
+
+                body = exporter.text().encode( 'utf-8' )
+                self.send_response( 200 )
+                self.send_header( 'Content-Type', CONTENT_TYPE )
+                self.send_header( 'Content-Length', str( len( body ) ) )
+                self.end_headers()
+                self.wfile.write( body )
+
+            def log_message( self, *args ): pass # no line on stderr per scrape
+
+        self._server = server = _http.HTTPServer( ( host, port ), Handler )
+
+        thread = threading.Thread( target = server.serve_forever, name = 'progress-exporter' )
+        thread.setDaemon( True )
+        thread.start()
+
+        return server.server_address
+
+    def close( self ):
+        """ stop the HTTP server and the textfile writer ( if any ), and write the textfile the last time """
+
+        server, self._server = self._server, None
+        if server is not None :
+            server.shutdown()
+            server.server_close()
+
+        with self._lock :
+            self._closed = True
+            writer, self._writer = self._writer, None
+
+        if writer is not None :
+            self._changed.set()
+            writer.join()
+
+        if self._textfile is not None :
+            self.write()
+
+
+## --------------------------------------------------------------------------
+## --------------------------------------------------------------------------
+
+# a test
+if __name__ == '__main__' :
+
+    import tempfile
+    import urllib2
+    from time import sleep
+
+    import progress
+
+    N = 20
+
+    def func( count = 0, total = N ): pass
+
+    textfile = os.path.join( tempfile.mkdtemp(), 'progress.prom' )
+
+    exporter = Exporter( textfile = textfile )
+    host, port = exporter.serve( 0 ) # any free port
+
+    p = progress.Progress( func, sleep = 0.2, snapshot = True, counters = ( 'count', ) )
+    exporter.register( p, 'demo' )
+
+    for i in xrange( N ):
+        p._counter( 'count' ).add( 1 )
+        sleep( 0.05 )
+
+    p._join()
+
+    print >>sys.stderr, urllib2.urlopen( 'http://%s:%d/metrics' % ( host, port ) ).read()
+
+    exporter.close() # the textfile is complete after this
+
+    print >>sys.stderr, '%s:' % ( textfile, )
+    print >>sys.stderr, open( textfile ).read()
@@ -0,0 +1,173 @@
+#!/usr/bin/python
+
+"""
+
+    A virtual clock for testing the periodic machinery without waiting for it :
+    a VirtualClock is both the 'clock' and the 'scheduler' of a Progress, so there is no thread --
+    the reports run in the caller's thread, in deadline order, as the test advances the time :
+
+    import progress, harness
+
+    clock = harness.VirtualClock()
+    reporter = progress.Progress( func, sleep = 1, clock = clock.time, scheduler = clock )
+
+    clock.advance( 3600 ) # an hour of reports, in milliseconds
+    reporter._join() # the final report runs right here ( nothing to wait for )
+
+    A slow function is simulated by clock.sleep( seconds ) from inside of it: the time moves on,
+    but no other report runs in the meantime ( as with a real thread ) .
+
+    ( the same works for any object with the ._tick( deadline ) of a _CallPeriodically ;
+      a hook that converts the times, as timeseries.TimeSeries( clock = clock.time ), takes the same clock )
+
+"""
+
+import heapq
+import itertools
+
+
+## --------------------------------------------------------------------------
+
+class VirtualClock:
+    """ .time() is the virtual time; .add( obj, deadline ) is the _Scheduler interface; .advance() and .sleep() move the time """
+
+    def __init__( self, start = 0. ):
+
+        self.__now = start
+        self.__heap = [] # ( deadline, seq, obj )
+        self.__seq = itertools.count()
+        self.__running = False # inside a _tick(): .add() only schedules
+
+        self.log = [] # ( time, obj ) of every _tick() run, in order
+
+    def time( self ):
+
+        return self.__now
+
+    def add( self, obj, deadline = None ):
+        """ schedule obj._tick() at 'deadline' ( now, by default -- and "now" runs at once, unless from inside a tick ) """
+
+        if deadline is None :
+            deadline = self.__now
+
+        heapq.heappush( self.__heap, ( deadline, next( self.__seq ), obj ) )
+
+        if not self.__running :
+            self.__run_due()
+
+    def __run_due( self ):
+        """ run the ticks due by now, in ( deadline, order of scheduling ) order """
+
+        heap = self.__heap
+        while heap and heap[0][0] <= self.__now :
+            deadline, seq, obj = heapq.heappop( heap )
+
+            self.__running = True
+            try:
+                self.log.append( ( self.__now, obj ) )
+                deadline = obj._tick( deadline )
+            finally:
+                self.__running = False
+
+            if deadline is not None :
+                heapq.heappush( heap, ( deadline, next( self.__seq ), obj ) )
+
+    def advance( self, seconds ):
+        """ move the time forward, stopping at every deadline on the way to run the ticks due """
+
+        until = self.__now + seconds
+        heap = self.__heap
+
+        while heap and heap[0][0] <= until :
+            self.__now = max( self.__now, heap[0][0] )
+            self.__run_due()
+
+        self.__now = max( self.__now, until )
+
+    def sleep( self, seconds ):
+        """ a function "taking time": from inside a tick, the time just moves; from outside, it is .advance() """
+
+        if self.__running :
+            self.__now += seconds
+        else:
+            self.advance( seconds )
+
+    def pending( self ):
+        """ the deadlines scheduled, the earliest first """
+
+        return sorted( deadline for deadline, seq, obj in self.__heap )
+
+
+## --------------------------------------------------------------------------
+## --------------------------------------------------------------------------
+
+# a test ( the checks of the machinery: they take milliseconds, not the minutes they simulate )
+if __name__ == '__main__' :
+
+    import sys
+    import time
+
+    import progress
+    import progress2
+
+    for module in progress, progress2 :
+
+        started = time.time()
+
+        # ticks are "interval" apart, starting at once
+        clock = VirtualClock()
+        calls = []
+        def func( a = 0 ): calls.append( ( clock.time(), a ) )
+
+        p = module.Progress( func, sleep = 1, clock = clock.time, scheduler = clock )
+        p.a = 1
+        clock.advance( 3.5 )
+        assert [ t for t, a in calls ] == [ 0, 1, 2, 3 ], calls
+
+        # the final report: at once, with the last values, and only one
+        p.a = 2
+        assert p._join( 0 ) is True
+        assert calls[ -1 ] == ( 3.5, 2 ), calls
+        clock.advance( 10 )
+        assert len( calls ) == 5, calls
+
+        # a slow function: no drift, the missed ticks are skipped, the phase is kept
+        clock = VirtualClock()
+        calls = []
+        def slow( a = 0 ):
+            calls.append( clock.time() )
+            clock.sleep( 2.5 )
+
+        p = module.Progress( slow, sleep = 1, clock = clock.time, scheduler = clock ) # the first call takes till 2.5
+        clock.advance( 7.5 )
+        assert calls == [ 0, 3, 6, 9 ], calls
+        p._join()
+
+        # the reporter's statistics see the virtual durations
+        assert p._stats()[ 'last_callback' ] == 2.5, p._stats()
+
+        # several objects on one clock: deadline order, then the order of scheduling ( at 6: 'second' was rescheduled at 3, 'first' at 4 )
+        clock = VirtualClock()
+        order = []
+        def first( a = 0 ): order.append( ( clock.time(), 'first' ) )
+        def second( a = 0 ): order.append( ( clock.time(), 'second' ) )
+
+        p1 = module.Progress( first, sleep = 2, clock = clock.time, scheduler = clock )
+        p2 = module.Progress( second, sleep = 3, clock = clock.time, scheduler = clock )
+        clock.advance( 6 )
+        assert order == [ ( 0, 'first' ), ( 0, 'second' ), ( 2, 'first' ), ( 3, 'second' ),
+                          ( 4, 'first' ), ( 6, 'second' ), ( 6, 'first' ) ], order
+        p1._join()
+        p2._join()
+
+        # an hour of one-second reports
+        clock = VirtualClock()
+        calls = []
+        p = module.Progress( func, sleep = 1, clock = clock.time, scheduler = clock )
+        t0 = time.time()
+        clock.advance( 3600 )
+        p._join()
+        assert len( calls ) == 3602, len( calls ) # 0 .. 3600, and the final one
+        per_tick = ( time.time() - t0 ) / len( calls )
+
+        print >>sys.stderr, "%s: ok in %.1f ms ( %.1f us per simulated report )" % ( module.__name__, ( time.time() - started ) * 1000, per_tick * 1e6 )
@@ -0,0 +1,179 @@
+#!/usr/bin/python
+
+"""
+
+    Progress counters for 'multiprocessing' workers:
+    the numbers are kept in shared memory, one row of slots per worker process,
+    so that a worker writes without any IPC or lock, and the parent sums the rows
+    ( the summing is done by the reporter thread of a usual Progress object )
+
+    Usage:
+
+    import progress, mpprogress
+
+    # at the module level, before the pool is created ( the workers get it by inheritance )
+    counters = mpprogress.SharedCounters( ('count',), slots = 16 )
+
+    def work( item ):
+        ...
+        counters.add( 'count' ) # in a worker process
+
+    # << parent : >>
+    def print_progress( count, total ): ...
+
+    reporter = progress.Progress( print_progress, counters = counters.counters() )
+    reporter.total = len( items )
+
+    multiprocessing.Pool( 8 ).map( work, items )
+    reporter._join()
+
+
+    On fork: the reporter thread does not survive in a child process,
+    so a worker should never touch the Progress object ( nor its lock, which may be held at the moment of the fork ) --
+    only the SharedCounters; a process notices that it is a new one by its pid and takes a fresh row on its first write .
+
+    Every process that ever writes takes a row of its own ( the rows of finished workers keep their numbers ),
+    so 'slots' should cover all the worker processes -- e.g. more than the pool size with 'maxtasksperchild' .
+
+"""
+
+import exceptions
+import multiprocessing
+import os
+
+
+## --------------------------------------------------------------------------
+
+#
+# our exceptions
+#
+
+class Error(exceptions.Exception):
+    """ Argument of wrong type or value, or a run-time error """
+
+class ValueError( exceptions.ValueError, Error ): pass
+class RuntimeError( exceptions.RuntimeError, Error ): pass
+
+
+## --------------------------------------------------------------------------
+
+class SharedCounters:
+    """
+        'len(names) * slots' doubles in shared memory; a process writes only to its own row,
+        .value( name ) sums a column over the rows taken so far
+    """
+
+    def __init__( self, names, slots = None ):
+        """ 'names' is a sequence of field names, 'slots' is the max. number of writer processes ( cpu_count() + 1 by default ) """
+
+        if slots is None :
+            slots = multiprocessing.cpu_count() + 1 # the parent may write as well
+
+        self._names = tuple( names )
+        self._index = dict(  ( name, index ) for index, name in enumerate( self._names )  )
+        self._slots = slots
+
+        # no lock: every row has a single writer
+        self._array = multiprocessing.RawArray( 'd', slots * len( self._names ) )
+        # the rows taken so far ( this one has a lock, but it is used once per process )
+        self._taken = multiprocessing.Value( 'i', 0 )
+
+        self._row = None # the offset of our row ...
+        self._pid = None # ... valid in this process only
+
+    def _offset( self ):
+        """ the offset of this process's row; taken on the first call in a process ( incl. a forked one ) """
+
+        pid = os.getpid()
+        if pid != self._pid :
+
+            with self._taken.get_lock() :
+                row = self._taken.value
+                if row >= self._slots :
+                    raise RuntimeError( "no free slots left for the process %d [ %d slots are taken ]" % ( pid, self._slots )  )
+                self._taken.value = row + 1
+
+            self._row = row * len( self._names )
+            self._pid = pid
+
+        return self._row
+
+    def add( self, name, n = 1 ):
+        """ add 'n' to this process's slot for 'name' """
+
+        self._array[ self._offset() + self._index[ name ] ] += n
+
+    def set( self, name, value ):
+        """ set this process's slot for 'name' ( the parent sees the sum over the processes ) """
+
+        self._array[ self._offset() + self._index[ name ] ] = value
+
+    def value( self, name ):
+        """ the sum over all the processes """
+
+        array = self._array
+        index = self._index[ name ]
+        width = len( self._names )
+
+        return sum(  array[ offset + index ] for offset in xrange( 0, self._taken.value * width, width )  )
+
+    def counter( self, name ):
+        """ a per-name view, as accepted by Progress( ..., counters = { name : counter } ) """
+
+        if name not in self._index :
+            raise ValueError( "unknown name '%s' [ known names: %s ]" % ( name, self._names )  )
+
+        return _Counter( self, name )
+
+    def counters( self ):
+        """ { name : counter } for all the names """
+
+        return dict(  ( name, self.counter( name ) ) for name in self._names  )
+
+
+class _Counter:
+    """ one column of the SharedCounters; has the .add() / .value() interface of a Progress counter """
+
+    def __init__( self, shared, name ):
+
+        self.__shared = shared
+        self.__name = name
+
+    def add( self, n = 1 ):
+
+        self.__shared.add( self.__name, n )
+
+    def value( self ):
+
+        return self.__shared.value( self.__name )
+
+
+## --------------------------------------------------------------------------
+## --------------------------------------------------------------------------
+
+# a test
+if __name__ == '__main__' :
+
+    import sys
+    import time
+
+    import progress
+
+    N = 4000
+
+    counters = SharedCounters( ('count',), slots = 5 )
+
+    def work( i ):
+        time.sleep( 0.001 )
+        counters.add( 'count' )
+
+    def func( count = 0, total = N ): print >>sys.stderr, "\tprogress: %d of %d" % ( count, total )
+
+    p = progress.Progress( func, sleep = 0.5, counters = counters.counters() )
+
+    pool = multiprocessing.Pool( 4 )
+    pool.map( work, xrange( N ), chunksize = 10 )
+    pool.close()
+    pool.join()
+
+    p._join()
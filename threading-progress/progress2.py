@@ -43,10 +43,64 @@ from types import FunctionType
 # from locked import Locked
 # from locked import _DbgRLock
 import threading 
+import heapq
+import itertools
+import operator
 
-from time import sleep
+from time import sleep, time
 
 import sys # stderr
+import os
+import errno
+import select
+import atexit
+import signal
+import weakref
+
+from math import frexp, ceil
+
+def _clock_gettime():
+    """ 
+        python 2 on Linux has no time.monotonic(): clock_gettime( CLOCK_MONOTONIC ) through ctypes ; 
+        None elsewhere -- then the deadlines go by time.time(), and a step back of the system clock 
+        stops the reports for as long as the step 
+    """
+    
+    if not sys.platform.startswith( 'linux' ) :
+        return None
+        
+    try:
+        import ctypes
+        import ctypes.util
+        
+        class timespec( ctypes.Structure ):
+            _fields_ = [ ( 'tv_sec', ctypes.c_long ), ( 'tv_nsec', ctypes.c_long ) ]
+            
+        libc = ctypes.CDLL( ctypes.util.find_library( 'rt' ) or ctypes.util.find_library( 'c' ), use_errno = True )
+        clock_gettime = libc.clock_gettime
+        clock_gettime.argtypes = [ ctypes.c_int, ctypes.POINTER( timespec ) ]
+        
+    except ( ImportError, EnvironmentError, AttributeError ) :
+        return None
+        
+    CLOCK_MONOTONIC = 1 # <linux/time.h> 
+    
+    def monotonic():
+        
+        ts = timespec() # one per call: the call releases the GIL 
+        if clock_gettime( CLOCK_MONOTONIC, ctypes.byref( ts ) ) :
+            errno_ = ctypes.get_errno()
+            raise OSError( errno_, os.strerror( errno_ ) )
+            
+        return ts.tv_sec + ts.tv_nsec * 1e-9
+        
+    return monotonic
+    
+
+try:
+    from time import monotonic as _clock # python 3.3+
+except ImportError:
+    _clock = _clock_gettime() or time # the best we have ( see _clock_gettime() ) 
 
 ## from collections import namedtuple # requires 2.6 or higher // *and is immutable !!*
 
@@ -80,6 +134,150 @@ class _DbgRLock :
         # return False  
 
 
+## --------------------------------------------------------------------------  
+
+#
+# an instrumented RLock and the histograms it fills ( Progress( ..., instrument = True ) )
+#
+
+class _Histogram( object ):
+    """ 
+        Durations in log2 buckets of microseconds: bucket 0 is "< 1 us", bucket i is [ 2**(i-1), 2**i ) us ; 
+        fixed memory ( 'buckets' ints ), O(1) per value, no lock -- every histogram has a single writer 
+        ( the lock ones are written under that lock, the reporter ones by the reporter thread ) 
+    """
+    
+    __slots__ = ( 'counts', 'count', 'total', 'max' )
+    
+    def __init__( self, buckets = 32 ): # 2**31 us is about 36 minutes 
+        
+        self.counts = [0] * buckets
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+        
+    def add( self, seconds ):
+        
+        us = seconds * 1e6
+        if us < 1 :
+            index = 0
+        else:
+            index = min( frexp( us )[1], len( self.counts ) - 1 )
+            
+        self.counts[ index ] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max :
+            self.max = seconds
+            
+    def percentile( self, q ):
+        """ the upper bound ( in seconds ) of the bucket where the 'q' share ( 0..1 ) of the values is reached """
+        
+        counts = list( self.counts ) # a copy: the writer goes on 
+        need = q * sum( counts )
+        
+        seen = 0
+        for index, n in enumerate( counts ):
+            seen += n
+            if n and seen >= need :
+                return min( 2 ** index / 1e6, self.max )
+                
+        return 0.
+        
+    def summary( self ):
+        """ { 'count', 'mean', 'p50', 'p99', 'max' } in seconds """
+        
+        count = self.count
+        return { 'count' : count, 'mean' : self.total / count if count else 0., 
+                 'p50' : self.percentile( 0.5 ), 'p99' : self.percentile( 0.99 ), 'max' : self.max }
+        
+    def __str__( self ):
+        
+        return "%(count)d, mean %(mean).6f s, p50 < %(p50).6f s, p99 < %(p99).6f s, max %(max).6f s" % self.summary()
+        
+
+class _TimedRLock( object ):
+    """ 
+        An RLock that records the time to acquire it ( 'wait' ) and the time it is held ( 'hold', the outermost acquire() to release() ) 
+        for about one acquisition in 'sample' -- the histograms are a sample, their counts that share of the acquisitions 
+        ( a thread that comes while a sampled one is due is timed too: the contended waits are kept, if anything ) ; 
+        the other acquisitions cost a count and a depth on top of the RLock: 'with reporter:' is about 1.5 times 
+        as slow as with a plain RLock ( a timed one, twice: two _clock() calls; see bench_progress.py, 'update' ) 
+    """
+    
+    def __init__( self, sample = 16 ):
+        
+        self._lock = threading.RLock()
+        self.wait = _Histogram()
+        self.hold = _Histogram()
+        self.sample = sample
+        
+        self.__count = 0 # the outermost releases, to pick the sampled acquisitions ( counted under the lock, read without it ) 
+        self.__depth = 0 # changed by the owner only 
+        self.__since = None # the outermost acquire(), when it is timed 
+        
+    def acquire( self, blocking = True ):
+        
+        if self.__count % self.sample : # a nested acquire() reads the count of its outermost one: either both are timed, or neither 
+            if not self._lock.acquire( blocking ):
+                return False
+            self.__depth += 1
+            return True
+            
+        start = _clock()
+        if not self._lock.acquire( blocking ):
+            return False
+            
+        # the histograms are written under the lock itself 
+        self.__depth += 1
+        if self.__depth == 1 :
+            now = _clock()
+            self.wait.add( now - start )
+            self.__since = now
+            
+        return True
+        
+    def release( self ):
+        
+        self.__depth -= 1
+        if self.__depth == 0 :
+            self.__count += 1
+            if self.__since is not None :
+                self.hold.add( _clock() - self.__since )
+                self.__since = None
+            
+        self._lock.release()
+        
+    __enter__ = acquire
+    
+    def __exit__( self, *args ): # release(), without a call 
+        
+        self.__depth -= 1
+        if self.__depth == 0 :
+            self.__count += 1
+            if self.__since is not None :
+                self.hold.add( _clock() - self.__since )
+                self.__since = None
+            
+        self._lock.release()
+        
+
+_instrumented = weakref.WeakSet() # the _CallPeriodically objects with 'instrument' set 
+
+def _dump_timings( stream = None ):
+    """ print the histograms of all the live instrumented Progress objects ( registered with atexit ) """
+    
+    if stream is None :
+        stream = sys.stderr
+        
+    for obj in list( _instrumented ) :
+        print >>stream, "progress timings for %s:" % ( obj.name(), )
+        for name, histogram in sorted( obj.histograms().items() ) :
+            print >>stream, "\t%-14s %s" % ( name, histogram )
+            
+atexit.register( _dump_timings )
+
+
 ## --------------------------------------------------------------------------  
 
 # from exceptions import Exception as base_exception
@@ -180,42 +378,36 @@ class _LockGuardMixin:
 
 ## NamedList, then a descriptor to "forward" values 
 
-class NamedList:
+class NamedList( object ):
     """
         The list is intended to have a fixed length, 
         but the elements may change value 
         
-        ( it is quite easy to implemend .append(), though )
+        ( it is quite easy to implemend .append(), though ) 
+        
+        NamedList( names ) returns an instance of a subclass made for these names: 
+        the values are kept in __slots__ ( no per-instance __dict__ ), 
+        and the subclass is made once per names tuple and cached -- 
+        -- so the 1000th list for the same function does not make a new class 
     """
     
+    __slots__ = ()
+    
+    _names = () # set in the subclasses 
+    
+    def __new__( cls, names, values = None, tail = False ):
+        
+        if cls is NamedList :
+            cls = _named_list_class( tuple( names ) )
+            
+        return object.__new__( cls )
+    
     def __init__( self, names, values = None, tail = False ):
-        """ 'names' is assumed to be a sequence of names, 
+        """ 'names' is assumed to be a sequence of names ( checked by _named_list_class() ), 
             values may be either initial values or None ( == do not initialize the attributes ), 
             'tail' means that the values should be assigned to the last, not to the first names
         """
         
-        # no for "name order"
-        self.__no = {}
-        
-        #
-        # check for reserved names -- and set the name order
-        #
-        
-        _reserved = _fieldnames( self )
-        for index, name in enumerate( names ) :  
-            if name.startswith('__') or name in _reserved :
-                return ValueError(  "the name '%s' is reserved; a name can not start with an '__' or be in the following list: %s" % (_reserved, )  )
-            
-            # else ...
-            self.__no[ index ] = name
-            ## # could be convenient
-            ## self.__on[ name ] = index
-        
-        
-        # an experiment have shown that we do not need to have a correct (even nonzero) value in .__len__(), but let's do things properly :     
-        self.__len = index + 1
-        
-        
         #
         # initialize the attributes, if we have to
         #
@@ -236,28 +428,232 @@ class NamedList:
     # this is all we need to have the "function( *args )" notation: 
     def __getitem__( self, index ):
         
-        # if index not in self.__no.keys() : raise exceptions.IndexError( "index out of range: %d" % (index, )  ) 
-        if index >= self.__len : raise exceptions.IndexError( "index out of range: %d" % (index, )  )
-        
-        attrname = self.__no[ index ]
-        
-        return getattr( self, attrname )
+        return getattr( self, self._names[ index ] ) # IndexError comes from the tuple 
 
     ## # why need "setitem" if we have names ? )
 
     # seems we don't need this ( but let's have it )
-    def __len__(self): return self.__len
+    def __len__(self): return len( self._names )
     
-    # we don't need this as well, but having an iterator seems to be convenient  
+    # "func( *named_list )" and "tuple( named_list )" go here: one attrgetter() call for all the values 
     def __iter__( self ): 
         
-        # for i in sorted( self.__no.keys() ):
-        for i in xrange( self.__len ) :
+        return iter( self._get( self ) )
             
-            attrname = self.__no[ i ]
-            yield getattr( self, attrname )
+    def _fields( self ):
+        """ the names, in order """
+        
+        return self._names
+        
+
+_named_list_classes = {} # names tuple => NamedList subclass 
+
+def _named_list_class( names ):
+    """ the NamedList subclass for the given names ( made on the first call ) """
+    
+    klass = _named_list_classes.get( names )
+    if klass is not None :
+        return klass
+    
+    # else ... check for reserved names 
+    _reserved = dir( NamedList )
+    for name in names :  
+        if name.startswith('__') or name in _reserved :
+            raise ValueError(  "the name '%s' is reserved; a name can not start with an '__' or be in the following list: %s" % (name, _reserved, )  )
+    
+    if len( names ) > 1 :
+        get = operator.attrgetter( *names ) # returns a tuple 
+    elif names :
+        get = lambda obj, _get = operator.attrgetter( *names ): ( _get( obj ), )
+    else:
+        get = lambda obj: ()
+    
+    _dict_ = { '__slots__' : names, '_names' : names, '_get' : staticmethod( get ) }
+    klass = type( 'NamedList(%s)' % ( ', '.join( names ), ), ( NamedList, ), _dict_ )
+    
+    # no lock: two threads may make two classes at once, but only one gets cached 
+    return _named_list_classes.setdefault( names, klass )
+
+## --------------------------------------------------------------------------  
+
+#
+# a counter without a lock on the write path: 
+# every thread adds to its own slot, the reader sums the slots 
+#
+
+class _ShardedCounter( object ):
+    """ 
+        .add() takes no lock: a thread writes only to its own slot ( a one-item list ), 
+        .value() sums the slots ( O(live threads), fine for once in an interval ) ; 
+        the slot of a thread that is gone ( its Thread object collected ) is folded into a base total, 
+        so that a thread per item does not make the slots grow 
+    """
+    
+    def __init__( self ):
+        
+        self.__local = threading.local()
+        self.__lock = threading.Lock() # not on the .add() path: a new slot, a .value() 
+        self.__slots = {} # weakref( thread ) => slot 
+        self.__gone = [] # the weakrefs of the threads that are gone, to be folded by .value() 
+        self.__base = 0 # the slots folded so far 
+        
+    def __new_slot( self ):
+        """ called once per thread """
+        
+        slot = [0]
+        ref = weakref.ref( threading.current_thread(), self.__fold )
+        with self.__lock :
+            self.__slots[ ref ] = slot
+        self.__local.slot = slot
+        
+        return slot
+        
+    def __fold( self, ref ):
+        """ the thread is gone, and so are its .add() calls ( a weakref callback: it may come from the gc anywhere, even inside .value() -- so no lock here ) """
+        
+        self.__gone.append( ref )
+        
+    def add( self, n = 1 ):
+        
+        try:
+            slot = self.__local.slot
+        except exceptions.AttributeError: # the first call from this thread 
+            slot = self.__new_slot()
             
+        slot[0] += n
+        
+    def value( self ):
         
+        with self.__lock :
+            gone = self.__gone
+            while gone :
+                slot = self.__slots.pop( gone.pop(), None )
+                if slot is not None :
+                    self.__base += slot[0]
+                    
+            return self.__base + sum( slot[0] for slot in self.__slots.itervalues() )
+        
+
+
+class _ItemCount( object ):
+    """ the count of a Progress._wrap() loop: one attribute store per item, read at every report ( .value() ) """
+    
+    __slots__ = ( 'count', )
+    
+    def __init__( self ):
+        
+        self.count = 0
+        
+    def value( self ):
+        
+        return self.count
+        
+
+## --------------------------------------------------------------------------  
+
+#
+# a wait that sleeps in the kernel 
+#
+
+class _Wakeup( object ):
+    """ 
+        The part of threading.Event the periodic threads need ( .set(), .isSet(), .clear(), .wait( timeout ) ), over a pipe: 
+        .wait() is one poll() ( or select() ) till the timeout or a .set() -- 
+        -- python 2's Event.wait( timeout ) polls instead, in sleeps of up to 50 ms 
+        
+        nb. two file descriptors per object, till .close() -- see _wakeup() for how many there may be 
+    """
+    
+    def __init__( self ):
+        
+        self.__r, self.__w = os.pipe()
+        
+        self.__poll = None # select() can not take a descriptor above FD_SETSIZE ( 1024 ), poll() can 
+        if hasattr( select, 'poll' ) :
+            self.__poll = select.poll()
+            self.__poll.register( self.__r, select.POLLIN )
+        self.__lock = threading.Lock() # .set() vs. .close(): no write to a closed ( or reused ) descriptor 
+        self.__set = False
+        self.__closed = False
+        
+    def set( self ):
+        
+        with self.__lock :
+            if not self.__set and not self.__closed :
+                self.__set = True
+                os.write( self.__w, b'x' )
+                
+    def isSet( self ):
+        
+        return self.__set
+        
+    def clear( self ):
+        
+        with self.__lock :
+            if self.__set and not self.__closed :
+                os.read( self.__r, 1 ) # the one byte of the .set() 
+                self.__set = False
+                
+    def wait( self, timeout = None ):
+        """ returns the flag ( False on a timeout ); a signal may end the wait early, as with a timeout """
+        
+        if not self.__set :
+            try:
+                if self.__poll is not None :
+                    self.__poll.poll( None if timeout is None else int( ceil( timeout * 1000 ) ) ) # ms 
+                else:
+                    select.select( [ self.__r ], [], [], timeout )
+            except select.error, e : 
+                if e.args[0] != errno.EINTR :
+                    raise
+                    
+        return self.__set
+        
+    def close( self ):
+        
+        with self.__lock :
+            if not self.__closed :
+                self.__closed = True
+                os.close( self.__r )
+                os.close( self.__w )
+                
+                _release_pipe()
+                
+
+_MAX_WAKEUP_PIPES = 32 # the descriptors are the application's: no more than 64 of them for us 
+
+_pipes_lock = threading.Lock()
+_pipes = 0 # the live _Wakeup objects 
+
+def _wakeup():
+    """ 
+        a threading.Event where its .wait( timeout ) sleeps in the kernel ( python 3.2+ ) or where select() does not work on pipes ( Windows ) ; 
+        a _Wakeup otherwise -- up to _MAX_WAKEUP_PIPES at a time, the objects past that get a ( polling ) threading.Event 
+    """
+    
+    global _pipes
+    
+    if sys.version_info >= ( 3, 2 ) or os.name != 'posix' :
+        return threading.Event()
+        
+    with _pipes_lock :
+        if _pipes >= _MAX_WAKEUP_PIPES :
+            return threading.Event()
+        _pipes += 1
+        
+    try:
+        return _Wakeup()
+    except EnvironmentError : # EMFILE, ENFILE: not ours to take then 
+        _release_pipe()
+        return threading.Event()
+        
+
+def _release_pipe():
+    
+    global _pipes
+    
+    with _pipes_lock :
+        _pipes -= 1
     
 
 ## --------------------------------------------------------------------------  
@@ -289,6 +685,11 @@ with _lock:
 sleep(_interval)
 
 
+--- (later) : ---
+
+the sleep() is a wait on a _wakeup() ( an Event, or on python 2 a poll() on a pipe ) till the next deadline, so that kill() wakes the thread up at once ;
+the deadlines are "interval" apart on the clock, so the time spent in the function does not add up ;
+after kill(), the function is called for the last time ( join() waits for that )
 
 """
 
@@ -299,46 +700,296 @@ class _CallPeriodically:
         both protected with a lock
     """
     
-    def __init__( self, func, named_args, lock, interval=1 ):
+    def __init__( self, func, named_args, lock, interval=1, snapshot=False, counters=(), hooks=(), adaptive=False, budget=0.02, max_interval=None, instrument=False, clock=None ):
         """
             with lock:
                 __call__() func( *named_args )
                 
             sleep( interval )
+            
+            with 'snapshot' set, the lock is held only to copy the values: 
+            
+            with lock:
+                args = tuple( named_args )
+            func( *args )
+            
+            'counters' is a sequence of ( name, _ShardedCounter ) pairs, 
+            their values are stored to 'named_args' before every call ; 
+            
+            'hooks' are called before the function as 'hook( fields, now )', 
+            where 'fields' is a { name : value } copy of 'named_args' -- 
+            -- a hook may add (derived) values to it, and the function gets 
+            those that match its argument names ( see e.g. the 'throughput' module ) ; 
+            a hook with a .close() method gets it called after the final report ; 
+            
+            nb. the hooks run wherever the function runs -- under the lock, unless with 'snapshot' 
+            
+            with 'adaptive' set, the interval is not fixed: it doubles ( up to 'max_interval', 
+            60 * interval by default ) while a call takes more than 'budget' of the interval, 
+            and halves back ( down to 'interval' ) when a call takes less than a quarter of that ; 
+            when sys.stderr is not a terminal ( a log file, nobody watching it ), it starts from, 
+            and does not go below, 10 * interval 
+            
+            with 'instrument' set, the durations of the calls and how late the ticks come are kept in _Histograms 
+            ( see histograms(); the lock's 'wait' and 'hold' ones are there too, if it is a _TimedRLock ) 
+            
+            'clock' is a function returning seconds ( _clock, by default ), for the deadlines, the durations and the hooks' 'now' -- 
+            -- one that is not the real time makes sense with a scheduler on the same clock ( see _schedule_on() and the 'harness' module ) 
         
         """
     
         self.__func = func 
+        self.__clock = _clock if clock is None else clock
         self.__lock = lock
         self.__argref = named_args
         self.__interval = interval
+        self.__adaptive = adaptive
+        self.__budget = budget
+        if adaptive :
+            if max_interval is None :
+                max_interval = interval * 60
+            if not _isatty( sys.stderr ) :
+                interval = self.__interval = min( interval * 10, max_interval )
+        self.__min_interval = interval
+        self.__max_interval = max_interval if max_interval is not None else interval
+        self.__snapshot = snapshot
+        self.__counters = tuple( counters )
+        self.__hooks = tuple( hooks )
+        self.__names = named_args._fields()
         
         self.__done = False 
+        self.__wakeup = None # a _wakeup(), made by __call__() ( i.e. with a thread of our own ), set by kill()
+        self.__finished = threading.Event() # set after the final call
+        self.__scheduler = None # when run by a shared _Scheduler instead of an own thread 
+        
+        # statistics ( written by the reporting thread only ) 
+        self.ticks = 0 # the calls so far 
+        self.wakeups = 0 # the returns from the wait, with a thread of our own ( a tick or a kill() each, unless a signal interrupts it ) 
+        self.callback_seconds = 0. # the time spent in the hooks and the function, in total ... 
+        self.last_callback = 0. # ... and in the last call 
+        
+        self.__callback = self.__lateness = None
+        if instrument :
+            self.__callback = _Histogram()
+            self.__lateness = _Histogram()
+            _instrumented.add( self )
         
     def kill( self ): 
-        """ set the internal 'stop' flag; should take the effect within "time(funk()) + interval" seconds """
-        with self.__lock:
-            self.__done = True
+        """ set the internal 'stop' flag and wake the thread up; takes the effect at once, or after the current func() call """
+        
+        # no lock here: we do not want to wait for a slow func() to finish 
+        self.__done = True
+        wakeup = self.__wakeup
+        if wakeup is not None :
+            wakeup.set()
+        
+        if self.__scheduler is not None :
+            self.__scheduler.add( self ) # "wake up" == run the final _tick() now 
+            
+    def _schedule_on( self, scheduler ):
+        """ an alternative to running __call__() in a thread of our own """
+        
+        self.__scheduler = scheduler
+        scheduler.add( self )
+        
+    def interval( self ):
+        """ the current interval ( it changes in the 'adaptive' mode ) """
+        
+        return self.__interval
+        
+    def budget( self ):
+        """ the share of the interval a call may take before the interval grows ( None unless 'adaptive' ) """
+        
+        return self.__budget if self.__adaptive else None
+        
+    def __adapt( self ):
+        """ grow the interval after an expensive call, shrink it back after a cheap one """
+        
+        interval = self.__interval
+        limit = self.__budget * interval
+        
+        if self.last_callback > limit :
+            self.__interval = min( interval * 2, self.__max_interval )
+        elif self.last_callback < limit / 4. :
+            self.__interval = max( interval / 2., self.__min_interval )
+        
+    def add_hook( self, hook ):
+        
+        # a new tuple: the running _report() keeps iterating the old one 
+        self.__hooks = self.__hooks + ( hook, )
+        
+    def add_counter( self, name, counter ):
+        """ add a ( name, counter ) pair to 'counters', replacing the one for the same name, if any """
+        
+        # a new tuple, as in add_hook() 
+        self.__counters = tuple(  ( n, c ) for n, c in self.__counters if n != name  ) + ( ( name, counter ), )
+        
+    def remove_counter( self, name, counter ):
+        """ drop the ( name, counter ) pair, if it is still there ( not replaced by another counter ) ; 
+            call it under the lock, so that a report in progress does not store the counter's value after that 
+        """
+        
+        self.__counters = tuple(  ( n, c ) for n, c in self.__counters if ( n, c ) != ( name, counter )  )
+        
+    def stats( self ):
+        """ { 'ticks', 'wakeups', 'callback_seconds', 'last_callback', 'interval', 'budget' } ( no lock: a plain read of numbers ) """
+        
+        return { 'ticks' : self.ticks, 'wakeups' : self.wakeups, 'callback_seconds' : self.callback_seconds, 
+                 'last_callback' : self.last_callback, 'interval' : self.__interval, 'budget' : self.budget() }
+        
+    def name( self ):
+        
+        return self.__func.__name__
+        
+    def histograms( self ):
+        """ { 'callback', 'tick_lateness', 'lock_wait', 'lock_hold' : _Histogram } ( empty unless 'instrument' ) """
+        
+        ret = {}
+        if self.__callback is not None :
+            ret[ 'callback' ] = self.__callback
+            ret[ 'tick_lateness' ] = self.__lateness
+            
+        if isinstance( self.__lock, _TimedRLock ) :
+            ret[ 'lock_wait' ] = self.__lock.wait
+            ret[ 'lock_hold' ] = self.__lock.hold
+            
+        return ret
+        
+    def join( self, timeout = None ):
+        """ wait for the final call after kill(); returns False on a timeout """
+        
+        self.__finished.wait( timeout )
+        return self.__finished.isSet()
          
-    
-    def __call__( self ):
+    def _report( self ):
+        """ call the function once; in the 'snapshot' mode, workers are blocked only for the time of an O(fields) copy """
         
-        while not self.__done: 
+        try:
+            # sum the counters before taking the lock
+            counters = self.__counters
+            counted = [ ( name, counter, counter.value() ) for name, counter in counters ]
             
             with self.__lock:
                 ## if self.__done: 
                 ##     # delete the references ?
                 ##     return
+                
+                # a counter removed meanwhile ( under the lock, see remove_counter() ) does not write its old value 
+                current = self.__counters
+                for name, counter, value in counted :
+                    if current is counters or ( name, counter ) in current :
+                        setattr( self.__argref, name, value )
                     
-                # else ...  
-                try:
+                if not self.__snapshot :
                     ## # dbg
                     ## sys.stderr.write('.')
-                    self.__func( *(self.__argref) )
-                except exceptions.Exception, e: # trying to handle most of them
-                    print >>sys.stderr, "thread function caused an exception (will be ignored): '%s'" % (e, )
+                    self.__call( self.__argref )
+                    return
                 
-            sleep( self.__interval )
+                # else ...  
+                args = tuple( self.__argref )
+                
+            # the slow part (e.g. writing to a terminal) goes without the lock
+            self.__call( args )
+                    
+        except exceptions.Exception, e: # trying to handle most of them
+            print >>sys.stderr, "thread function caused an exception (will be ignored): '%s'" % (e, )
+    
+    def __call( self, args ):
+        """ run the hooks ( if any ), then the function """
+        
+        start = self.__clock()
+        try:
+            self.__call_hooks_and_func( args, start )
+        finally:
+            self.last_callback = elapsed = self.__clock() - start
+            self.callback_seconds += elapsed
+            self.ticks += 1
+            if self.__callback is not None :
+                self.__callback.add( elapsed )
+            
+    def __call_hooks_and_func( self, args, now ):
+        
+        hooks = self.__hooks
+        if hooks :
+            names = self.__names
+            fields = dict( zip( names, args ) )
+            
+            for hook in hooks :
+                try:
+                    hook( fields, now )
+                except exceptions.Exception, e: 
+                    print >>sys.stderr, "progress hook %r caused an exception (will be ignored): '%s'" % (hook, e, )
+                    
+            args = [ fields[ name ] for name in names ]
+            
+        self.__func( *args )
+    
+    def __close_hooks( self ):
+        
+        for hook in self.__hooks :
+            close = getattr( hook, 'close', None )
+            if close is not None :
+                try:
+                    close()
+                except exceptions.Exception, e: 
+                    print >>sys.stderr, "progress hook %r caused an exception (will be ignored): '%s'" % (hook, e, )
+        
+    def _tick( self, deadline ):
+        """ one step of the loop: call the function, return the next deadline ( None after the final call ) """
+        
+        if self.__finished.isSet() : # e.g. a stale _Scheduler entry 
+            return None
+        
+        if self.__done : 
+            # the final report 
+            self._report()
+            self.__close_hooks()
+            if self.__wakeup is None : # with a thread of our own, __call__() sets it, once it has cleaned up 
+                self.__finished.set()
+            return None
+        
+        # else ... 
+        if self.__lateness is not None :
+            self.__lateness.add( max( 0., self.__clock() - deadline ) )
+            
+        self._report()
+        
+        if self.__adaptive :
+            self.__adapt()
+            
+        interval = self.__interval
+        deadline += interval
+        now = self.__clock()
+        if deadline < now : # func() took longer than the interval: skip the missed ticks, but stay "in phase" 
+            deadline += ( (now - deadline) // interval + 1 ) * interval
+            
+        return deadline
+        
+    def __call__( self ):
+        
+        # made before the first _tick(): a kill() before this is seen as 'done' there 
+        self.__wakeup = wakeup = _wakeup()
+        
+        deadline = self.__clock()
+        
+        try:
+            while True :
+                
+                deadline = self._tick( deadline )
+                if deadline is None :
+                    break
+                    
+                wakeup.wait( max( 0, deadline - self.__clock() ) ) # kill() wakes us up earlier 
+                self.wakeups += 1
+                
+        finally:
+            close = getattr( wakeup, 'close', None ) # a threading.Event has none 
+            if close is not None :
+                close()
+                
+            # the last thing the thread does: join() returns when there is nothing left to run ( e.g. at the interpreter exit ) 
+            self.__finished.set()
             
         # after thread exits, this may fail when finally gets active:
         ## # dbg
@@ -346,6 +997,238 @@ class _CallPeriodically:
         ##    print >>sys.stderr, "done."
         
 
+def _isatty( stream ):
+    
+    try:
+        return stream.isatty()
+    except exceptions.Exception: # no such method, a closed file ...
+        return False
+    
+
+
+## --------------------------------------------------------------------------  
+
+#
+# one thread for many _CallPeriodically objects
+#
+
+class _Scheduler:
+    """ 
+        Runs ._tick() of the added objects on a single thread, each at its own deadlines 
+        ( a heap of "(deadline, seq, object)" ; the ticks due within 'slack' seconds run on the same wake-up ) ; 
+        
+        nb. the functions are called one after another, so a slow one delays the rest ( 'snapshot' helps the workers, not the other reporters ) 
+    """
+    
+    def __init__( self, name = 'progress-scheduler', slack = 0.005 ):
+        
+        self.__lock = threading.Lock()
+        self.__wakeup = None # a _wakeup() ( made with the thread ), set by .add() when the thread waits for a later deadline 
+        self.__waiting = False
+        self.__heap = []
+        self.__seq = itertools.count() # "(deadline, seq)" pairs are unique, so the objects themselves are never compared 
+        self.__slack = slack
+        
+        self.__name = name
+        self.__thread = None # started on the first .add() 
+        
+        self.wakeups = 0 # statistics 
+        
+    def add( self, obj, deadline = None ):
+        """ schedule obj._tick() at 'deadline' ( now, by default ) """
+        
+        if deadline is None :
+            deadline = _clock()
+            
+        with self.__lock :
+            entry = ( deadline, next( self.__seq ), obj )
+            heapq.heappush( self.__heap, entry )
+            
+            if self.__thread is None :
+                self.__wakeup = _wakeup()
+                self.__thread = thread = threading.Thread( target = self.__run, name = self.__name )
+                thread.setDaemon( True )
+                thread.start()
+                
+            # the thread re-reads the heap before every wait: wake it up only for a new earliest deadline 
+            if self.__waiting and self.__heap[0] is entry :
+                self.__wakeup.set()
+            
+    def __due( self ):
+        """ wait for the earliest deadline, return all the entries that are due by then """ 
+        
+        heap = self.__heap
+        wakeup = self.__wakeup
+        
+        while True :
+            with self.__lock :
+                now = _clock()
+                if heap and heap[0][0] <= now + self.__slack :
+                    due = []
+                    while heap and heap[0][0] <= now + self.__slack :
+                        due.append( heapq.heappop( heap ) )
+                        
+                    return due
+                    
+                wakeup.clear()
+                self.__waiting = True
+                timeout = heap[0][0] - now if heap else None
+                
+            # an .add() from here on sets the wakeup, and the wait returns at once 
+            wakeup.wait( timeout )
+            self.wakeups += 1
+            
+            with self.__lock :
+                self.__waiting = False
+        
+    def __run( self ):
+        
+        while True :
+            for deadline, seq, obj in self.__due() :
+                
+                # not under the lock: obj._tick() may call .add() 
+                deadline = obj._tick( deadline )
+                if deadline is not None :
+                    self.add( obj, deadline )
+                    
+
+_scheduler_lock = threading.Lock()
+_the_scheduler = None
+
+def _scheduler():
+    """ the process-wide _Scheduler ( created on the first call ) """
+    
+    global _the_scheduler
+    
+    with _scheduler_lock :
+        if _the_scheduler is None :
+            _the_scheduler = _Scheduler()
+            
+    return _the_scheduler
+    
+
+## --------------------------------------------------------------------------  
+
+#
+# no thread at all: the ticks come from a SIGALRM handler ( Progress( ..., timer = True ) )
+#
+
+class _NoLock :
+    """ 
+        'with reporter:' takes no lock: the function runs on the same ( the main ) thread as the workers, between two bytecodes ; 
+        the block only counts its depth, so that a tick that comes inside it runs at its end ( see _SignalTimer ), 
+        not on half-updated values 
+    """
+    
+    def __init__( self ):
+        
+        self.depth = 0
+        self.deferred = None # a tick that came inside the block 
+        
+    def acquire( self, blocking = True ):
+        
+        self.depth += 1
+        return True
+        
+    def release( self ):
+        
+        self.depth -= 1
+        if not self.depth and self.deferred is not None :
+            run, self.deferred = self.deferred, None
+            run()
+    
+    def __enter__( self ): return self.acquire()
+    def __exit__( self, *args ): self.release()
+    
+
+class _SignalTimer :
+    """ 
+        The _Scheduler interface ( .add( obj, deadline ) ) over setitimer( ITIMER_REAL ): 
+        obj._tick() runs in a SIGALRM handler, i.e. on the main thread, between two bytecodes of whatever it runs -- 
+        -- or, when that is inside a 'with reporter:' block ( 'lock', a _NoLock ), at the end of the block ; 
+        one object at a time ( SIGALRM is one per process ) 
+        
+        nb. the hooks run in the handler as well, so a lock they take may be held by the code the signal interrupted: 
+        it should be an RLock ( a Lock would deadlock ), as it is in the hooks here ( tree, render, timeseries, sampler, export ) 
+        
+        nb. siginterrupt( SIGALRM, False ) restarts only what the kernel restarts ( a blocking read() or write() ) -- 
+        -- on Python 2, time.sleep() returns early at every tick, and select() / poll() raise EINTR ( 'Interrupted system call' ), 
+        so this is not for a worker that sleeps or polls ( Python 3.5+ retries those, PEP 475 ) ; 
+        and a C extension busy for long delays the handler till it returns 
+    """
+    
+    def __init__( self, lock ):
+        
+        self.__lock = lock
+        self.__obj = None
+        self.__deadline = None
+        self.__previous = None # the SIGALRM handler to restore 
+        
+    def add( self, obj, deadline = None ):
+        """ run obj._tick() at 'deadline' ( at once, by default -- e.g. the final report after kill() ) """
+        
+        global _signal_timer
+        
+        if self.__obj is None :
+            with _signal_timer_lock :
+                if _signal_timer is not None :
+                    raise RuntimeError( "only one Progress( timer = True ) may run at a time [SIGALRM is taken]" )
+                    
+                try:
+                    self.__previous = signal.signal( signal.SIGALRM, self.__handler )
+                except exceptions.ValueError, e : # not the main thread 
+                    raise RuntimeError( "Progress( timer = True ) should be started on the main thread [%s]" % ( e, ) )
+                    
+                signal.siginterrupt( signal.SIGALRM, False ) # SA_RESTART: helps read() / write(), not sleep() or select() 
+                _signal_timer = self
+                self.__obj = obj
+                
+        if deadline is None :
+            deadline = _clock()
+            
+        self.__deadline = deadline
+        delay = deadline - _clock()
+        if delay > 0 :
+            signal.setitimer( signal.ITIMER_REAL, delay )
+            return
+            
+        # else ... now, and no alarm in the middle of it 
+        signal.setitimer( signal.ITIMER_REAL, 0 )
+        self.__run()
+        
+    def __handler( self, signum, frame ):
+        
+        if self.__obj is None :
+            return
+            
+        if self.__lock.depth : # the worker is inside 'with reporter:' 
+            self.__lock.deferred = self.__run
+            return
+            
+        self.__run()
+            
+    def __run( self ):
+        
+        deadline = self.__obj._tick( self.__deadline )
+        if deadline is None :
+            self.__stop()
+        else:
+            self.add( self.__obj, deadline )
+            
+    def __stop( self ):
+        
+        global _signal_timer
+        
+        signal.setitimer( signal.ITIMER_REAL, 0 )
+        with _signal_timer_lock :
+            signal.signal( signal.SIGALRM, self.__previous if self.__previous is not None else signal.SIG_DFL )
+            _signal_timer = None
+            self.__obj = None
+            
+
+_signal_timer_lock = threading.Lock()
+_signal_timer = None # the running one 
+
 
 ## --------------------------------------------------------------------------  
 
@@ -374,7 +1257,10 @@ def __dir__(self):
 '''
 
 class _ForwardAttributesMixin:
-    """"""
+    """ forwards the given attribute names to another object ( unless they are the names of class attributes ) """
+    
+    # the names to forward; computed once, in __init__ -- __setattr__ is on the hot path 
+    __forward = frozenset()
     
     def __init__( self, referred_obj, attr_names ):
         """ 'attr_names' is a sequence of strings; use 'a b c'.split() , if it saves typing )  """ 
@@ -384,6 +1270,9 @@ class _ForwardAttributesMixin:
         
         self.__ref = referred_obj
         self.__names = attr_names[:]
+        
+        # 'normal' attributes have the priority ( and the class ones can not change ) 
+        self.__forward = frozenset( attr_names ) - frozenset( dir( self.__class__ ) ) - frozenset( self.__dict__ )
 
         ## # dbg
         ## print "__init__: done"
@@ -407,23 +1296,16 @@ class _ForwardAttributesMixin:
         # if self.__dict__.get( '_ForwardAttributesMixin' + '__ref', None ) is not None: 
         if self.__dict__.get( '_ForwardAttributesMixin__ref', None ) is not None: 
             
-            if attrname in self.__names:
+            if attrname in self.__forward:
                 return getattr( self.__ref, attrname )
             # else ...  
             # we are in __getattr__ -- this means that the "normal" attributes 
             # have already been looked for 
-            raise AttributeError(  "failed to get an attribute '%s' for class %s"  %  ( attrname, self.__class__ )  )     
-
-
-    def __dir( self ):
-        """ as we're going to define __dir__(), we need a way to get local dictionary """
-        
-        big_list = dir( self.__class__ ) # can not use _fieldnames() : would be recursive ! )
-        # big_list.extend( list( self.__dict__ ) ) # list( dict ) == list( dict.keys() )
-        big_list.extend( self.__dict__.keys() )  
-        
-        return sorted( _uniq( big_list ) )
+            raise AttributeError(  "failed to get an attribute '%s' for class %s"  %  ( attrname, self.__class__ )  )
 
+        # else ... __init__ did not happen yet ( e.g. dir() looks for __dir__ here ):
+        # an implicit 'return None' would make the attribute exist, and be None
+        raise AttributeError( attrname )
 
     def __setattr__( self, attrname, value ): 
         
@@ -431,32 +1313,23 @@ class _ForwardAttributesMixin:
         ## # print "__setattr__(%s, %s)" % (self, attrname) # inf. recursion in __str__ !!
         ## print "__setattr__(%s)" % ( attrname, )
         
-        set_local = True # 'normal' attributes have the priority 
-        
-        # names = getattr( self, '_ForwardAttributesMixin__names', () ) # in __init__() returns None anyway (?!)
-        names = self.__dict__.get( '_ForwardAttributesMixin__names', () )
-        ## # dbg:
-        ## print "got __names:", names
-        
-        if attrname not in self.__dir() and attrname in names : 
-            set_local = False
-            
-        if set_local : # the "normal" way  
-            # [ http://docs.python.org/release/2.5.2/ref/attribute-access.html ] # use object.__setattr__ or __dict__  
-            # [ http://bugs.python.org/issue14671 ] # make the difference 
-            # [  ]
-            new_style = issubclass( self.__class__, object )
-            if new_style :  
-                # return super(_ForwardAttributesMixin, self).__setattr__(  ) 
-                # let's try to avoid an extra proxy object creation
-                return object.__setattr__( self, attrname, value )
-            else: # an old-style class instance 
-                # to-do: check for the attrname in parents ? ( for rare cases like a "singleton" class attribute ? )
-                self.__dict__[ attrname ] = value
-                return value # allow "a =b=c" expressions )
-                
-        else: 
+        # a set lookup instead of building and sorting dir() on every call 
+        if attrname in self.__forward : 
             return setattr( self.__ref, attrname, value )
+            
+        # else ... the "normal" way  
+        # [ http://docs.python.org/release/2.5.2/ref/attribute-access.html ] # use object.__setattr__ or __dict__  
+        # [ http://bugs.python.org/issue14671 ] # make the difference 
+        # [  ]
+        new_style = issubclass( self.__class__, object )
+        if new_style :  
+            # return super(_ForwardAttributesMixin, self).__setattr__(  ) 
+            # let's try to avoid an extra proxy object creation
+            return object.__setattr__( self, attrname, value )
+        else: # an old-style class instance 
+            # to-do: check for the attrname in parents ? ( for rare cases like a "singleton" class attribute ? )
+            self.__dict__[ attrname ] = value
+            return value # allow "a =b=c" expressions )
 
     '''
     def __dir__( self ) :
@@ -587,6 +1460,46 @@ class Progress( _ForwardAttributesMixin, _LockGuardMixin ) :
         2) it should not have any *varargs or **kwargs ( as they are harder to be Lock()-ed ),
         3) and its argument names should differ from any attribute names for this class.
            ( avoid names starting with underscores and use dir(<object>) for a quick check )
+           
+        With 'snapshot = True', the function is called on a copy of the values, outside the lock, 
+        so that a slow function (e.g. printing to a slow terminal) does not block the workers 
+        ( the lock is held only while the values are copied ) 
+        
+        'counters' lists the argument names to be updated without the lock, as in 
+        
+            add = reporter._counter( 'count' ).add
+            for ... : 
+                add( 1 ) # no 'with reporter:' here 
+                
+        ( every thread adds to its own slot; the slots are summed once per interval ) ; 
+        'counters' may also be a { name : counter } dict, a counter being anything with a .value() method 
+        
+        With 'shared = True', there is no thread of its own: the function is called 
+        by a single process-wide scheduler thread, together with the other 'shared' Progress objects 
+        ( 'thread_name' is ignored then ) 
+        
+        'hooks' see the values before the function does, and may add derived ones 
+        ( e.g. throughput.Throughput() adds 'rate' and 'eta' ), see _CallPeriodically 
+        
+        With 'adaptive = True', 'sleep' is the shortest interval: the interval grows ( up to 'max_sleep' ) 
+        while a call takes more than the 'budget' share of it, or when sys.stderr is not a terminal, 
+        and shrinks back when the calls get cheap; see _stats() for the current 'interval' and 'budget' 
+        
+        With 'instrument = True', the lock is a _TimedRLock, and the lock wait and hold times ( sampled: one in 16 ), 
+        the call durations and the tick lateness go to fixed-size log2 histograms: 
+        see _timings(), they are also printed to stderr at exit 
+        
+        With 'timer = True' ( for a single-threaded script, on the main thread ), there is neither a thread nor a lock: 
+        the function is called from a SIGALRM handler ( signal.setitimer() ) between two bytecodes of the worker, 
+        or at the end of the 'with reporter:' block it came in; 'shared', 'thread_name' and 'instrument' ( for the lock ) 
+        do not apply, and a hook that takes a lock should take an RLock ( see _SignalTimer ) ; 
+        on Python 2, the signal makes time.sleep() return early and select() raise EINTR in the worker -- 
+        -- use a thread for a worker that sleeps or waits on I/O 
+        
+        'clock' ( a function returning seconds ) and 'scheduler' ( anything with the _Scheduler's .add( obj, deadline ) ) 
+        replace the real time and the thread, e.g. with a harness.VirtualClock() for both: 
+        then the reports happen only as the test advances the virtual time ; 
+        a 'clock' with 'shared' or 'timer' and no 'scheduler' is a ValueError ( their deadlines are on _clock ) 
     """
     
     '''
@@ -621,7 +1534,7 @@ class Progress( _ForwardAttributesMixin, _LockGuardMixin ) :
         return False  
     
 
-    def __init__( self, func, sleep = 1, start_now = True, thread_name = None ): 
+    def __init__( self, func, sleep = 1, start_now = True, thread_name = None, snapshot = False, counters = (), shared = False, hooks = (), adaptive = False, budget = 0.02, max_sleep = None, instrument = False, timer = False, clock = None, scheduler = None ): 
         """
             The initialization is a bit tricky: as we need to "forward" some attributes --
             -- and go with descriptors for that purpose ( an alternative would be to use __getattr__ / __setattr__ 
@@ -641,37 +1554,121 @@ class Progress( _ForwardAttributesMixin, _LockGuardMixin ) :
         # else ... ( most '__'-fields are used for debugging mostly ) )
         ## self.__argnames = argnames = argspec.args
         argnames = argspec.args
+        for name in counters :
+            if name not in argnames :
+                raise ValueError( "a counter should be one of the function arguments %s [got '%s']" % ( argnames, name )  )
+                
+        # the shared scheduler and the signal timer keep their deadlines on _clock: one 'clock' has to drive the reports and the deadlines 
+        if clock is not None and scheduler is None and ( shared or timer ) :
+            raise ValueError( "'clock' needs its own 'scheduler' with 'shared' or 'timer' ( e.g. a harness.VirtualClock() for both )" )
+                
         defaults = argspec.defaults
-        ## self.__nl = named_list = NamedList( argnames, defaults, tail = True ) # assign default values from the tail, first left will get None
-        named_list = NamedList( argnames, defaults, tail = True ) # assign default values from the tail, first left will get None
+        self.__nl = named_list = NamedList( argnames, defaults, tail = True ) # assign default values from the tail, first left will get None
                 
         _ForwardAttributesMixin.__init__( self, named_list, argnames )
                 
-        self._lock = lock = threading.RLock()
+        if timer :
+            self._lock = lock = _NoLock()
+        else:
+            self._lock = lock = _TimedRLock() if instrument else threading.RLock()
         # self._lock = lock = _DbgRLock('dbglock') # also serves as a _LockGuardMixin "__init__" )
         
-        self.__callable = thread_callable = _CallPeriodically(func, named_list, lock, sleep )
+        if isinstance( counters, dict ) : # ready-made counters, e.g. from the 'mpprogress' module 
+            self.__counters = dict( counters )
+        else:
+            self.__counters = dict(  ( name, _ShardedCounter() ) for name in counters  )
+        self.__callable = thread_callable = _CallPeriodically(func, named_list, lock, sleep, snapshot, self.__counters.items(), hooks,
+                                                              adaptive, budget, max_sleep, instrument, clock )
         # keep a reference just in case ) 
-        self.__thread = thread = threading.Thread( target = thread_callable, name = thread_name )
-        thread.setDaemon( True )
+        if scheduler is not None :
+            self.__thread = None
+            self.__start = lambda: thread_callable._schedule_on( scheduler )
+        elif timer :
+            self.__thread = None
+            self.__start = lambda: thread_callable._schedule_on( _SignalTimer( lock ) )
+        elif shared :
+            self.__thread = None
+            self.__start = lambda: thread_callable._schedule_on( _scheduler() )
+        else:
+            self.__thread = thread = threading.Thread( target = thread_callable, name = thread_name )
+            thread.setDaemon( True )
+            self.__start = thread.start
         
         self.__once = CallOnce()
         
         if start_now :
             # thread.start()
-            self.__once( self.__thread.start ) 
+            self.__once( self.__start ) 
             
         
         
+    def _counter( self, name ):
+        """ the lock-free counter for a name in 'counters'; use its .add() instead of 'with reporter: reporter.<name> += n' """
+        
+        return self.__counters[ name ]
+        
+    def _stats( self ):
+        """ the reporter's statistics: 'ticks', 'wakeups' ( of its own thread ), 'callback_seconds' ( total ), 'last_callback', 'interval' """
+        
+        return self.__callable.stats()
+        
+    def _timings( self ):
+        """ { 'lock_wait', 'lock_hold', 'callback', 'tick_lateness' : { 'count', 'mean', 'p50', 'p99', 'max' } } ( empty unless 'instrument' ) """
+        
+        return dict(  ( name, histogram.summary() ) for name, histogram in self.__callable.histograms().items()  )
+        
+    def _add_hook( self, hook ):
+        """ add a hook ( see 'hooks' ) to a running Progress """
+        
+        self.__callable.add_hook( hook )
+        
     def _done( self ):
-        """ tell the thread function to stop """
+        """ tell the thread function to stop ( it wakes up and does the final report ); see also _join() """
         
         self.__callable.kill()
         
     def _start_once( self ):
         """ on the first call, starts the thread; then does nothing """
         
-        self.__once( self.__thread.start ) 
+        self.__once( self.__start ) 
+        
+    def _wrap( self, iterable, name = None ):
+        """ yields the items of 'iterable', counting them to the field 'name' 
+            ( the first function argument, by default ) and starting the thread ; 
+            
+            there is no lock per item: the count is a counter ( see 'counters' ) that the loop 
+            writes with one attribute store per item, and every report reads -- so the reported count 
+            is that of the report time, however the items speed up or slow down ; 
+            after the loop the field is set to the final count, and is a plain field again 
+        """
+        
+        if name is None :
+            name = self.__nl._fields()[ 0 ]
+            
+        counter = _ItemCount()
+        thread_callable = self.__callable
+        thread_callable.add_counter( name, counter )
+        
+        self._start_once()
+        
+        try:
+            for counter.count, item in enumerate( iterable, 1 ): # the count comes with the item, no "+= 1" per item 
+                yield item
+                
+        finally: # also when the loop over us is left early: the field is up to date at once, not at the next report 
+            with self:
+                thread_callable.remove_counter( name, counter )
+                setattr( self, name, counter.count )
+            
+    def _join( self, timeout = None ):
+        """ stop the thread and wait for its final report ( there is one even if the thread was never started ); 
+            returns False on a timeout 
+        """
+        
+        self.__callable.kill()
+        self.__once( self.__start ) # the thread does only the final report if started here 
+        
+        return self.__callable.join( timeout )
         
 
     '''
@@ -718,7 +1715,5 @@ if __name__ == '__main__' :
         print >>sys.stderr, 'sleep %d seconds (i = %d)' % (t, i)
         sleep(t)
     
-    p._done()
-    
-    sleep(1)
+    p._join()
     
@@ -0,0 +1,274 @@
+#!/usr/bin/python
+
+"""
+
+    A renderer for Progress: a hook that redraws a line in place on a terminal
+    ( writing only the characters that have changed ), or, when the stream is not a terminal,
+    writes a usual log line -- but not more often than once in 'log_interval' seconds .
+
+    import progress, render
+
+    def nothing( count, total ): pass # the hook does the printing
+
+    reporter = progress.Progress( nothing, snapshot = True,
+                                  hooks = [ render.Bar( '%(count)d of %(total)d files', counter = 'count', total = 'total' ) ] )
+
+    Several Bars on the same stream ( e.g. one per Progress, all in different threads ) get a line each,
+    and the writes go under a lock, so the lines do not get mixed up ;
+    anything else written to the same stream in the meantime will confuse the picture, though .
+
+    ( the terminal should understand the usual ANSI/VT100 cursor movements )
+
+"""
+
+import os
+import sys
+import threading
+
+from time import time
+
+
+## --------------------------------------------------------------------------
+
+#
+# the lines of one stream
+#
+
+class Display:
+    """
+        Keeps the current text of every line it has given out ( the last lines of the terminal ),
+        the cursor is kept at the start of the last one between the writes
+    """
+
+    def __init__( self, stream = sys.stderr, log_interval = 30. ):
+
+        self._stream = stream
+        self._lock = threading.RLock() # an RLock: .update() may run in a signal handler on the thread that holds it ( Progress( timer = True ) )
+
+        try:
+            self._tty = stream.isatty()
+        except AttributeError:
+            self._tty = False
+
+        self._log_interval = log_interval
+
+        self._lines = [] # the text on the screen, per line
+        self._logged = [] # when a line was logged the last time ( not a terminal )
+
+    def line( self ):
+        """ a new line number for a Bar """
+
+        with self._lock:
+            if self._tty and self._lines :
+                self._stream.write( '\n' ) # the cursor moves to the new last line
+
+            self._lines.append( '' )
+            self._logged.append( None )
+
+            return len( self._lines ) - 1
+
+    def update( self, line, text, force = False ):
+        """ show 'text' in the line; on a terminal, write only what has changed,
+            otherwise, write a log line unless the previous one was less than 'log_interval' seconds ago ( or with 'force' )
+        """
+
+        with self._lock:
+            if self._tty :
+                self._redraw( line, text )
+            else:
+                now = time()
+                last = self._logged[ line ]
+                if force or last is None or now - last >= self._log_interval :
+                    self._logged[ line ] = now
+                    self._lines[ line ] = text
+                    self._stream.write( text + '\n' )
+                    self._stream.flush()
+
+    def _redraw( self, line, text ):
+
+        old = self._lines[ line ]
+        if text == old :
+            return
+
+        up = len( self._lines ) - 1 - line
+
+        out = []
+        if up :
+            out.append( '\033[%dA' % ( up, ) ) # cursor up
+
+        column = 0
+        for start, end in _changes( old, text ):
+            if start > column :
+                out.append( '\033[%dC' % ( start - column, ) ) # cursor forward, over the unchanged part
+            out.append( text[ start:end ] )
+            column = end
+
+        if len( text ) < len( old ) :
+            if len( text ) > column :
+                out.append( '\033[%dC' % ( len( text ) - column, ) )
+            out.append( '\033[K' ) # erase the rest of the old text
+
+        out.append( '\r' )
+        if up :
+            out.append( '\033[%dB' % ( up, ) ) # back to the last line
+
+        self._lines[ line ] = text
+        self._stream.write( ''.join( out ) )
+        self._stream.flush()
+
+    def close( self ):
+        """ leave the cursor below the lines ( on a terminal ) """
+
+        with self._lock:
+            if self._tty and self._lines :
+                self._stream.write( '\n' )
+                self._stream.flush()
+
+            self._lines = []
+            self._logged = []
+
+
+def _changes( old, new, gap = 4 ):
+    """ the ( start, end ) ranges of 'new' that differ from 'old' ; 
+        the ranges less than 'gap' characters apart are merged, as a cursor move costs about as much 
+    """
+
+    common = min( len( old ), len( new ) )
+
+    ranges = []
+    i = 0
+    while i < common :
+        if old[ i ] == new[ i ] :
+            i += 1
+            continue
+
+        j = i + 1
+        while j < common and old[ j ] != new[ j ] :
+            j += 1
+
+        if ranges and i - ranges[ -1 ][ 1 ] < gap :
+            ranges[ -1 ] = ( ranges[ -1 ][ 0 ], j )
+        else:
+            ranges.append( ( i, j ) )
+        i = j
+
+    if len( new ) > common : # the new tail
+        if ranges and common - ranges[ -1 ][ 1 ] < gap :
+            ranges[ -1 ] = ( ranges[ -1 ][ 0 ], len( new ) )
+        else:
+            ranges.append( ( common, len( new ) ) )
+
+    return ranges
+
+
+_displays = {} # id( stream ) => Display
+_displays_lock = threading.Lock()
+
+def display( stream = None ):
+    """ the Display shared by all the Bars on the stream ( sys.stderr by default ) """
+
+    if stream is None :
+        stream = sys.stderr
+
+    with _displays_lock :
+        ret = _displays.get( id( stream ) )
+        if ret is None :
+            ret = _displays[ id( stream ) ] = Display( stream )
+
+    return ret
+
+
+## --------------------------------------------------------------------------
+
+#
+# the hook
+#
+
+class Bar:
+    """
+        A Progress hook that shows the fields in a line of a Display ;
+
+        'fmt' is either a "%(name)s" format string, or a function( fields ) returning the text,
+        by default, all the fields as "name=value" ; with 'counter' and 'total', the text gets a bar in front
+    """
+
+    def __init__( self, fmt = None, counter = None, total = None, width = 30, min_interval = 0.1, stream = None ):
+
+        self._fmt = fmt
+        self._counter = counter
+        self._total = total
+        self._width = width
+        self._min_interval = min_interval
+
+        self._display = display( stream )
+        self._line = self._display.line()
+
+        self._fields = None
+        self._shown = None # when
+
+    def text( self, fields ):
+
+        fmt = self._fmt
+        if fmt is None :
+            text = ' '.join( '%s=%s' % ( name, fields[ name ] ) for name in sorted( fields ) )
+        elif callable( fmt ) :
+            text = fmt( fields )
+        else:
+            text = fmt % fields
+
+        count = fields.get( self._counter )
+        total = fields.get( self._total )
+        if count is not None and total :
+            done = min( max( float( count ) / total, 0. ), 1. )
+            filled = int( done * self._width )
+            text = '[%s%s] %3d%% %s' % ( '#' * filled, ' ' * ( self._width - filled ), done * 100, text )
+
+        return text
+
+    def __call__( self, fields, now ):
+
+        self._fields = fields
+
+        # throttled: the reports may come more often than it makes sense to redraw
+        if self._shown is not None and now - self._shown < self._min_interval :
+            return
+
+        self._shown = now
+        self._display.update( self._line, self.text( fields ) )
+
+    def close( self ):
+        """ show the final values ( called by Progress after the final report ) """
+
+        if self._fields is not None :
+            self._display.update( self._line, self.text( self._fields ), force = True )
+
+
+## --------------------------------------------------------------------------
+## --------------------------------------------------------------------------
+
+# a test
+if __name__ == '__main__' :
+
+    from time import sleep
+
+    import progress
+
+    N = 40
+
+    def nothing( count = 0, total = N ): pass
+
+    bars = [ progress.Progress( nothing, sleep = 0.1, snapshot = True, counters = ( 'count', ),
+                                hooks = [ Bar( 'job %d: %%(count)d of %%(total)d' % ( i, ), 'count', 'total' ) ] )
+             for i in xrange( 3 ) ]
+
+    # the jobs go at different speeds
+    for i in xrange( 1, N + 1 ):
+        for j, p in enumerate( bars ):
+            if i % ( j + 1 ) == 0 :
+                p._counter( 'count' ).add( j + 1 )
+        sleep( 0.05 )
+
+    for p in bars :
+        p._join()
+
+    display().close()
@@ -0,0 +1,184 @@
+#!/usr/bin/python
+
+"""
+
+    A sampling profiler that rides on a Progress: a hook that, on every report, takes the current
+    stack of the worker threads ( sys._current_frames() ) and counts the "collapsed" stacks ;
+    at the end, the counts are written in the format of flamegraph.pl / speedscope / inferno :
+
+        MainThread;main (job.py);process (job.py);parse (parser.py) 42
+
+    import progress, sampler
+
+    profile = sampler.Sampler( 'job.folded' ) # written on close(), i.e. after the final report
+    profile.register() # sample this thread only ( by default: all the threads but the reporting one )
+
+    reporter = progress.Progress( print_progress, sleep = 0.1, snapshot = True, hooks = [ profile ] )
+
+    A sample per report is not much -- a shorter 'sleep' gives more of them ( and 'snapshot = True'
+    keeps the stack walk out of the Progress lock ) ; the memory is bounded by 'max_stacks' distinct stacks
+    ( the rest are counted as one '[other]' stack ) of at most 'max_depth' frames ( the outer ones are cut off ) .
+
+"""
+
+import os
+import sys
+import threading
+
+
+## --------------------------------------------------------------------------
+
+class _Threads:
+    """ the threads to look at: the registered ones, or all but the caller ( also used by watchdog.Watchdog ) """
+
+    def __init__( self ):
+
+        self._lock = threading.RLock() # register() vs. names() in another thread ( or under a signal handler: Progress( timer = True ) )
+        self._names = {} # ident => name, the registered threads ( none == all )
+
+    def register( self, thread = None ):
+        """ 'thread' is the current one by default """
+
+        if thread is None :
+            thread = threading.current_thread()
+
+        with self._lock :
+            self._names[ thread.ident ] = thread.name
+
+    def names( self ):
+        """ ident => name for the threads to look at """
+
+        with self._lock :
+            if self._names :
+                return dict( self._names )
+
+        # else ... all of them, but us
+        me = threading.current_thread().ident
+        return dict(  ( thread.ident, thread.name ) for thread in threading.enumerate() if thread.ident != me  )
+
+
+class Sampler:
+    """ a Progress hook counting the collapsed stacks of the registered ( or all the other ) threads """
+
+    OTHER = '[other]'
+
+    def __init__( self, path = None, max_stacks = 10000, max_depth = 64 ):
+        """ 'path' is where close() writes the stacks ( None: nowhere, see write() ) """
+
+        self._path = path
+        self._max_stacks = max_stacks
+        self._max_depth = max_depth
+
+        self._lock = threading.RLock() # for the counts: a sample vs. a .stacks() copy in another thread ( or under a signal handler: Progress( timer = True ) )
+        self._counts = {} # collapsed stack => samples
+        self._threads = _Threads()
+
+        self.samples = 0 # statistics
+
+    def register( self, thread = None ):
+        """ sample 'thread' ( the current one by default ); once a thread is registered, the others are not sampled """
+
+        self._threads.register( thread )
+
+    def _collapse( self, name, frame ):
+        """ "thread;outer;...;inner" """
+
+        frames = []
+        while frame is not None and len( frames ) < self._max_depth :
+            code = frame.f_code
+            frames.append( '%s (%s)' % ( code.co_name, os.path.basename( code.co_filename ) ) )
+            frame = frame.f_back
+
+        if frame is not None : # cut off
+            frames.append( '...' )
+
+        frames.append( name )
+        frames.reverse()
+
+        return ';'.join( frames )
+
+    def sample( self ):
+        """ take one sample of every thread to sample """
+
+        names = self._threads.names()
+        frames = sys._current_frames()
+
+        stacks = [ self._collapse( names[ ident ], frame ) for ident, frame in frames.items() if ident in names ]
+        del frames # the frames keep their locals alive
+
+        counts = self._counts
+        with self._lock :
+            for stack in stacks :
+                if stack not in counts and len( counts ) >= self._max_stacks :
+                    stack = self.OTHER
+                counts[ stack ] = counts.get( stack, 0 ) + 1
+            self.samples += 1
+
+    def __call__( self, fields, now ):
+
+        self.sample()
+
+    def stacks( self ):
+        """ { collapsed stack : samples } ( a copy ) """
+
+        with self._lock :
+            return dict( self._counts )
+
+    def write( self, path = None ):
+        """ write the "stack count" lines to 'path' ( the one given to __init__() by default ) """
+
+        if path is None :
+            path = self._path
+
+        f = open( path, 'w' )
+        try:
+            for stack, count in sorted( self.stacks().items() ) :
+                f.write( '%s %d\n' % ( stack, count ) )
+        finally:
+            f.close()
+
+    def close( self ):
+        """ called by Progress after the final report """
+
+        if self._path is not None :
+            self.write()
+
+
+## --------------------------------------------------------------------------
+## --------------------------------------------------------------------------
+
+# a test
+if __name__ == '__main__' :
+
+    import tempfile
+    from time import sleep
+
+    import progress
+
+    def func( count = 0 ): pass
+
+    path = os.path.join( tempfile.mkdtemp(), 'demo.folded' )
+
+    profile = Sampler( path )
+    profile.register()
+
+    p = progress.Progress( func, sleep = 0.01, snapshot = True, hooks = [ profile ] )
+
+    def slow( n ):
+        for i in xrange( n ):
+            sum( xrange( 1000 ) )
+
+    def fast( n ):
+        for i in xrange( n ):
+            sleep( 0.0001 )
+
+    for i in xrange( 20 ):
+        slow( 2000 )
+        fast( 100 )
+        with p:
+            p.count = i
+
+    p._join()
+
+    print >>sys.stderr, "%d samples, %s:" % ( profile.samples, path )
+    print >>sys.stderr, open( path ).read()
@@ -0,0 +1,169 @@
+#!/usr/bin/python
+
+"""
+
+    Memory and resource numbers next to the progress ones: a hook that adds fields for a function
+    that asks for them by argument name ( the others cost nothing but a dict entry ) :
+
+    import progress, telemetry
+
+    def print_progress( count, rss, gc_pause, open_fds ):
+        print >>sys.stderr, "%d rows, rss %.0f MB, gc %.3f s, %d fds" % ( count, rss / 1e6, gc_pause, open_fds )
+
+    reporter = progress.Progress( print_progress, hooks = [ telemetry.Telemetry() ] )
+
+    The added fields ( None where the platform or the Python has no way to tell ):
+
+        rss             -- the resident set size, bytes ( /proc/self/statm, Linux )
+        gc_counts       -- gc.get_count(): the allocations counted towards each generation
+        gc_collections  -- the collections so far ( gc.callbacks, Python 3.3+ )
+        gc_pause        -- the seconds spent in the collector so far ( same )
+        gc_max_pause    -- the longest collection since the previous report ( same )
+        open_fds        -- the number of open file descriptors ( /proc/self/fd, Linux )
+        tracemalloc_top -- [ ( "file:line", bytes ), ... ], the 'top' biggest allocation sites ( Python 3.4+ ) ;
+                           only with 'tracemalloc_every = N': a snapshot is heavy, so it is taken every N-th report,
+                           and the fields keep the last one in between
+
+    A report costs a read of a small /proc file and a directory listing; the gc numbers come
+    from a callback the collector calls anyway .
+
+"""
+
+import gc
+import os
+
+from progress import _clock # monotonic, python 2 included ( see progress._clock_gettime() )
+
+try:
+    import tracemalloc # python 3.4+
+except ImportError:
+    tracemalloc = None
+
+
+## --------------------------------------------------------------------------
+
+class Telemetry:
+    """ a Progress hook: adds 'rss', 'gc_counts', 'gc_collections', 'gc_pause', 'gc_max_pause', 'open_fds' and 'tracemalloc_top' """
+
+    names = ( 'rss', 'gc_counts', 'gc_collections', 'gc_pause', 'gc_max_pause', 'open_fds', 'tracemalloc_top' )
+
+    def __init__( self, tracemalloc_every = None, top = 10 ):
+        """ 'tracemalloc_every': take a tracemalloc snapshot every that many reports ( None: never ) """
+
+        try:
+            self._statm = open( '/proc/self/statm' )
+            self._page = os.sysconf( 'SC_PAGE_SIZE' )
+        except ( IOError, OSError, ValueError, AttributeError ):
+            self._statm = None
+
+        self._fd_dir = '/proc/self/fd' if os.path.isdir( '/proc/self/fd' ) else None
+
+        # the collector's pauses ( the callback runs in whatever thread triggers a collection )
+        self._gc_start = None
+        self._collections = 0
+        self._pause = 0.
+        self._max_pause = 0.
+        self._gc_callbacks = getattr( gc, 'callbacks', None )
+        if self._gc_callbacks is not None :
+            self._gc_callbacks.append( self._on_gc )
+
+        self._tracemalloc_every = tracemalloc_every if tracemalloc is not None else None
+        self._top = top
+        self._ticks = 0
+        self._last_top = None
+        if self._tracemalloc_every and not tracemalloc.is_tracing() :
+            tracemalloc.start()
+
+    def _on_gc( self, phase, info ):
+
+        if phase == 'start' :
+            self._gc_start = _clock()
+        elif self._gc_start is not None :
+            pause = _clock() - self._gc_start
+            self._gc_start = None
+            self._collections += 1
+            self._pause += pause
+            if pause > self._max_pause :
+                self._max_pause = pause
+
+    def _rss( self ):
+
+        if self._statm is None :
+            return None
+
+        self._statm.seek( 0 )
+        return int( self._statm.read().split()[ 1 ] ) * self._page
+
+    def _open_fds( self ):
+
+        if self._fd_dir is None :
+            return None
+
+        return len( os.listdir( self._fd_dir ) ) - 1 # less the one listdir() has open
+
+    def _tracemalloc_top( self ):
+
+        every = self._tracemalloc_every
+        if not every :
+            return None
+
+        if self._ticks % every == 0 :
+            stats = tracemalloc.take_snapshot().statistics( 'lineno' )[ : self._top ]
+            self._last_top = [ ( str( stat.traceback ), stat.size ) for stat in stats ]
+
+        return self._last_top
+
+    def __call__( self, fields, now ):
+
+        fields[ 'rss' ] = self._rss()
+        fields[ 'gc_counts' ] = gc.get_count()
+        fields[ 'open_fds' ] = self._open_fds()
+
+        if self._gc_callbacks is not None :
+            fields[ 'gc_collections' ] = self._collections
+            fields[ 'gc_pause' ] = self._pause
+            fields[ 'gc_max_pause' ] = self._max_pause
+            self._max_pause = 0. # "since the previous report"
+        else:
+            fields[ 'gc_collections' ] = fields[ 'gc_pause' ] = fields[ 'gc_max_pause' ] = None
+
+        fields[ 'tracemalloc_top' ] = self._tracemalloc_top()
+        self._ticks += 1
+
+    def close( self ):
+        """ called by Progress after the final report """
+
+        if self._gc_callbacks is not None and self._on_gc in self._gc_callbacks :
+            self._gc_callbacks.remove( self._on_gc )
+
+        if self._statm is not None :
+            self._statm.close()
+            self._statm = None
+
+
+## --------------------------------------------------------------------------
+## --------------------------------------------------------------------------
+
+# a test
+if __name__ == '__main__' :
+
+    import sys
+    from time import sleep
+
+    import progress
+
+    def func( count = 0, rss = None, gc_pause = None, open_fds = None, tracemalloc_top = None ):
+        print >>sys.stderr, "\tprogress: %d, rss %s, gc pause %s, fds %s" % ( count, rss, gc_pause, open_fds )
+        for site, size in tracemalloc_top or () :
+            print >>sys.stderr, "\t\t%8d %s" % ( size, site )
+
+    p = progress.Progress( func, sleep = 0.2, snapshot = True, hooks = [ Telemetry( tracemalloc_every = 5, top = 3 ) ] )
+
+    garbage = []
+    for i in xrange( 20 ):
+        garbage.append( [ {} for j in xrange( 10000 ) ] ) # the memory grows, the collector runs
+        with p:
+            p.count = i
+        sleep( 0.05 )
+
+    p._join()
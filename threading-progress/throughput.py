@@ -0,0 +1,110 @@
+#!/usr/bin/python
+
+"""
+
+    Rate and ETA for a Progress: a hook that keeps a short, time-stamped history
+    of a counter field and adds the derived values to the fields, so that
+    a function gets them just by naming its arguments accordingly:
+
+    import progress, throughput
+
+    def print_progress( count, total, ewma_rate, eta ):
+        if eta is not None:
+            print >>sys.stderr, "%d of %d, %.1f/s, %.0f s left" % ( count, total, ewma_rate, eta )
+
+    reporter = progress.Progress( print_progress, hooks = [ throughput.Throughput( 'count', 'total' ) ] )
+
+    The added fields ( None until there are two samples ):
+
+        rate        -- items per second since the previous report
+        window_rate -- items per second over the whole history ( 'history' reports )
+        ewma_rate   -- exponentially weighted rate, halving the weight of a sample every 'halflife' seconds
+        eta         -- seconds left till the counter reaches the total, at the 'ewma_rate'
+
+    The history is a bounded deque, so the memory does not grow however long the run is .
+
+"""
+
+import collections
+import math
+
+
+## --------------------------------------------------------------------------
+
+class Throughput:
+    """ a Progress hook: adds 'rate', 'window_rate', 'ewma_rate' and 'eta' for the 'counter' field """
+
+    names = ( 'rate', 'window_rate', 'ewma_rate', 'eta' )
+
+    def __init__( self, counter = 'count', total = 'total', history = 30, halflife = 10. ):
+        """ 'total' may be None ( no ETA then ) """
+
+        self._counter = counter
+        self._total = total
+
+        self._history = collections.deque( maxlen = history ) # ( time, value ) pairs
+        self._tau = halflife / math.log( 2 )
+
+        self._ewma = None
+
+    def __call__( self, fields, now ):
+
+        value = fields.get( self._counter )
+        total = fields.get( self._total )
+
+        history = self._history
+        rate = window_rate = eta = None
+
+        if value is not None :
+
+            if history :
+                t0, v0 = history[ -1 ]
+                if now > t0 :
+                    rate = ( value - v0 ) / float( now - t0 )
+
+                    # weight the new sample by the time it covers
+                    alpha = 1. - math.exp( -( now - t0 ) / self._tau )
+                    self._ewma = rate if self._ewma is None else self._ewma + alpha * ( rate - self._ewma )
+
+                t0, v0 = history[ 0 ]
+                if now > t0 :
+                    window_rate = ( value - v0 ) / float( now - t0 )
+
+            history.append( ( now, value ) )
+
+            if total is not None and self._ewma :
+                eta = max( 0., ( total - value ) / self._ewma )
+
+        fields[ 'rate' ] = rate
+        fields[ 'window_rate' ] = window_rate
+        fields[ 'ewma_rate' ] = self._ewma
+        fields[ 'eta' ] = eta
+
+
+## --------------------------------------------------------------------------
+## --------------------------------------------------------------------------
+
+# a test
+if __name__ == '__main__' :
+
+    import sys
+    from time import sleep
+
+    import progress
+
+    N = 50
+
+    def func( count = 0, total = N, rate = None, ewma_rate = None, eta = None ):
+        if eta is None:
+            print >>sys.stderr, "\tprogress: %d of %d" % ( count, total )
+        else:
+            print >>sys.stderr, "\tprogress: %d of %d, %.1f/s ( %.1f/s on average ), %.1f s left" % ( count, total, rate, ewma_rate, eta )
+
+    p = progress.Progress( func, sleep = 0.5, counters = ( 'count', ), hooks = [ Throughput( halflife = 1 ) ] )
+
+    add = p._counter( 'count' ).add
+    for i in xrange( N ):
+        add( 1 )
+        sleep( 0.1 if i < N / 2 else 0.05 ) # do hard work, then get faster
+
+    p._join()
@@ -0,0 +1,225 @@
+#!/usr/bin/python
+
+"""
+
+    The history of a Progress, in fixed memory: a hook that appends the numeric fields of every report
+    to a preallocated ring buffer, and keeps the older history downsampled -- every 'factor' rows of a level
+    are averaged into one row of the next level -- so that a run of days costs as much as a run of minutes :
+
+    import progress, timeseries
+
+    history = timeseries.TimeSeries( path = 'run.csv' ) # written at the end ( .jsonl for JSON lines )
+    reporter = progress.Progress( print_progress, hooks = [ history ] )
+    ...
+    history.export( 'so-far.jsonl' ) # or any time in between
+
+    With the defaults ( capacity = 720, levels = 4, factor = 10 ) and a report per second,
+    the last 12 minutes are kept per second, then 2 hours per 10 seconds, 20 hours per 100 seconds,
+    and 200 hours per 1000 seconds -- 4 * 720 rows in all .
+
+"""
+
+import array
+import json
+import threading
+
+from time import time as _wall
+
+from export import _number # a float, or None for what is not a number
+from progress import _clock # monotonic, python 2 included ( see progress._clock_gettime() )
+
+
+## --------------------------------------------------------------------------
+
+class _Level:
+    """ a ring of 'capacity' rows of 'width' doubles """
+
+    def __init__( self, capacity, width ):
+
+        self.capacity = capacity
+        self.width = width
+        self.data = array.array( 'd', [ 0. ] ) * ( capacity * width )
+        self.head = 0 # the row to write next
+        self.size = 0 # the rows written, up to 'capacity'
+
+        # the rows to be averaged into the next level
+        self.sums = [ 0. ] * width
+        self.pending = 0
+
+    def append( self, row ):
+
+        width = self.width
+        start = self.head * width
+        self.data[ start : start + width ] = array.array( 'd', row )
+
+        self.head = ( self.head + 1 ) % self.capacity
+        self.size = min( self.size + 1, self.capacity )
+
+    def widen( self, width ):
+        """ more columns, at the end: NaN in the rows so far ( and in the sums: the average they go to did not see them ) """
+
+        old = self.width
+        data = array.array( 'd', [ float( 'nan' ) ] ) * ( self.capacity * width )
+        for i in xrange( self.capacity ):
+            data[ i * width : i * width + old ] = self.data[ i * old : ( i + 1 ) * old ]
+
+        self.data = data
+        self.width = width
+        self.sums.extend( [ float( 'nan' ) ] * ( width - old ) )
+
+    def rows( self ):
+        """ the rows, the oldest first """
+
+        width = self.width
+        first = ( self.head - self.size ) % self.capacity
+
+        ret = []
+        for i in xrange( self.size ):
+            start = ( ( first + i ) % self.capacity ) * width
+            ret.append( self.data[ start : start + width ].tolist() )
+
+        return ret
+
+
+class TimeSeries:
+    """
+        A Progress hook: keeps ( time, field, ... ) rows of the numeric fields ( NaN for the other values ),
+        see the module doc; 'fields' fixes the columns, by default a field gets one when it is first a number
+        ( a rate that is None in the first report, say ), with NaN in the rows before
+    """
+
+    def __init__( self, fields = None, capacity = 720, levels = 4, factor = 10, path = None, clock = None ):
+        """ 'path' is where close() exports the rows ( None: nowhere, see export() ) ;
+            'clock' should be the 'clock' of the Progress, if it has one ( e.g. a harness.VirtualClock's .time ):
+            the hook's 'now' comes from it, and the times are made wall-clock ones from the offset at the start
+        """
+
+        self._fields = tuple( fields ) if fields is not None else ()
+        self._grow = fields is None
+        self._capacity = capacity
+        self._nlevels = levels
+        self._factor = factor
+        self._path = path
+
+        self._levels = None # made on the first report, and widened for a new column
+        self._lock = threading.RLock() # a report vs. an export ( from another thread, or interrupted by a report in a signal handler: Progress( timer = True ) )
+
+        self._offset = _wall() - ( _clock if clock is None else clock )() # the hook's 'now' to the wall clock
+
+    def __call__( self, fields, now ):
+
+        with self._lock :
+            if self._grow :
+                known = set( self._fields )
+                self._fields += tuple( sorted( name for name, value in fields.items() if name not in known and _number( value ) is not None ) )
+
+            row = [ now + self._offset ] + [ _number( fields.get( name ) ) for name in self._fields ]
+            row = [ float( 'nan' ) if value is None else value for value in row ]
+
+            if self._levels is None :
+                self._levels = [ _Level( self._capacity, len( row ) ) for i in xrange( self._nlevels ) ]
+            elif self._levels[ 0 ].width < len( row ) :
+                for level in self._levels :
+                    level.widen( len( row ) )
+
+            self._append( 0, row )
+
+    def _append( self, index, row ):
+        """ append to a level; every 'factor' rows, their average goes to the next level """
+
+        level = self._levels[ index ]
+        level.append( row )
+
+        if index + 1 == len( self._levels ) :
+            return
+
+        level.sums = [ a + b for a, b in zip( level.sums, row ) ]
+        level.pending += 1
+        if level.pending == self._factor :
+            average = [ value / self._factor for value in level.sums ]
+            level.sums = [ 0. ] * level.width
+            level.pending = 0
+            self._append( index + 1, average )
+
+    def columns( self ):
+
+        return ( 'time', ) + self._fields
+
+    def rows( self ):
+        """ all the rows, the oldest first: the coarse ones for the times the finer levels do not cover any more """
+
+        with self._lock :
+            if self._levels is None :
+                return []
+
+            ret = []
+            for level in reversed( self._levels ) :
+                rows = level.rows()
+                if rows :
+                    # the coarse rows the finer ones still cover are replaced by them
+                    while ret and ret[ -1 ][ 0 ] >= rows[ 0 ][ 0 ] :
+                        ret.pop()
+                    ret.extend( rows )
+
+            return ret
+
+    def export( self, path = None, format = None ):
+        """ write the rows as CSV or JSON lines ( 'format' is 'csv' or 'jsonl', by default from the file extension ) """
+
+        if path is None :
+            path = self._path
+        if format is None :
+            format = 'csv' if path.endswith( '.csv' ) else 'jsonl'
+
+        with self._lock : # a report may add a column
+            columns = self.columns()
+            rows = self.rows()
+
+        f = open( path, 'w' )
+        try:
+            if format == 'csv' :
+                f.write( ','.join( columns ) + '\n' )
+                for row in rows :
+                    f.write( ','.join( repr( value ) for value in row ) + '\n' )
+            else:
+                for row in rows :
+                    # NaN is not JSON: null
+                    f.write( json.dumps( dict(  ( name, None if value != value else value ) for name, value in zip( columns, row )  ), sort_keys = True ) + '\n' )
+        finally:
+            f.close()
+
+    def close( self ):
+        """ called by Progress after the final report """
+
+        if self._path is not None :
+            self.export()
+
+
+## --------------------------------------------------------------------------
+## --------------------------------------------------------------------------
+
+# a test
+if __name__ == '__main__' :
+
+    import os
+    import sys
+    import tempfile
+    from time import sleep
+
+    import progress
+
+    def func( count = 0 ): pass
+
+    path = os.path.join( tempfile.mkdtemp(), 'demo.csv' )
+
+    history = TimeSeries( capacity = 8, levels = 3, factor = 4, path = path ) # 8 + 8 * 4 + 8 * 16 reports
+    p = progress.Progress( func, sleep = 0.01, counters = ( 'count', ), hooks = [ history ] )
+
+    for i in xrange( 300 ):
+        p._counter( 'count' ).add( 1 )
+        sleep( 0.002 )
+
+    p._join()
+
+    print >>sys.stderr, "%d rows in %s:" % ( len( history.rows() ), path )
+    print >>sys.stderr, open( path ).read()
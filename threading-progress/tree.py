@@ -0,0 +1,200 @@
+#!/usr/bin/python
+
+"""
+
+    Hierarchical progress: stages, sub-stages, files ... as a tree of cheap nodes
+    whose counters roll up to the root; the root is a Progress hook, so the whole tree
+    is reported by the one periodic thread of a Progress:
+
+    import progress, tree
+
+    def print_progress( files, bytes, children ):
+        print >>sys.stderr, "%d files, %d bytes" % ( files, bytes )
+        for label, totals in children:
+            print >>sys.stderr, "\t%s: %d files" % ( label, totals['files'] )
+
+    jobs = tree.Tree( ('files', 'bytes') )
+    reporter = progress.Progress( print_progress, hooks = [ jobs ] )
+
+    stage = jobs.child( 'copy' )
+    for path in paths:
+        with stage.child( path ) as f: # .done() on exit
+            ...
+            f.bytes += len( chunk ) # no lock
+            f.files = 1
+    stage.done()
+
+    A node is written by one thread at a time ( the counters are plain attributes, no lock ),
+    creating a node and .done() take the tree's lock once each; a node that is done folds its totals
+    into its parent and is forgotten, so 100k files done do not cost more memory than one .
+
+"""
+
+import exceptions
+import threading
+
+
+## --------------------------------------------------------------------------
+
+#
+# our exceptions
+#
+
+class Error(exceptions.Exception):
+    """ Argument of wrong type or value, or a run-time error """
+
+class ValueError( exceptions.ValueError, Error ): pass
+
+
+## --------------------------------------------------------------------------
+
+class _Node( object ):
+    """ the counters are added as __slots__ by Tree ( a subclass per tree ) """
+
+    __slots__ = ( '_tree', '_parent', '_label', '_children', '_finished' )
+
+    def __init__( self, tree, parent, label ):
+
+        self._tree = tree
+        self._parent = parent
+        self._label = label
+        self._children = None # a set of the active children, made on demand
+        self._finished = None # the totals of the children that are done, made on demand
+
+        for name in tree._names :
+            setattr( self, name, 0 )
+
+    def child( self, label = None ):
+        """ a new node below this one """
+
+        tree = self._tree
+        node = tree._node_class( tree, self, label )
+
+        with tree._lock :
+            if self._children is None :
+                self._children = set()
+            self._children.add( node )
+
+        return node
+
+    def _totals( self ):
+        """ own values + the children that are done + the active children ( to be called under the tree's lock ) """
+
+        totals = [ getattr( self, name ) for name in self._tree._names ]
+
+        if self._finished is not None :
+            totals = [ a + b for a, b in zip( totals, self._finished ) ]
+
+        if self._children :
+            for child in self._children :
+                totals = [ a + b for a, b in zip( totals, child._totals() ) ]
+
+        return totals
+
+    def done( self ):
+        """ fold the totals into the parent and detach ( the active children, if any, get folded as they are ) """
+
+        tree = self._tree
+        with tree._lock :
+
+            parent = self._parent
+            if parent is None or parent._children is None or self not in parent._children :
+                return # the root, or done already
+
+            totals = self._totals()
+            parent._children.discard( self )
+
+            if parent._finished is None :
+                parent._finished = totals
+            else:
+                parent._finished = [ a + b for a, b in zip( parent._finished, totals ) ]
+
+    def __enter__( self ):
+
+        return self
+
+    def __exit__( self, *args ):
+
+        self.done()
+
+
+class Tree:
+    """
+        The root of a tree of nodes with the given counters ( numbers ), and a Progress hook :
+        the hook sets every counter name to the total over the tree,
+        and 'children' to a list of ( label, { name : total } ) for the active children of the root
+    """
+
+    def __init__( self, names ):
+
+        self._names = names = tuple( names )
+        for name in names :
+            if name.startswith( '_' ) or hasattr( _Node, name ) :
+                raise ValueError( "the name '%s' is reserved; a name can not start with an '_' or be in the following list: %s" % ( name, dir( _Node ) ) )
+
+        self._lock = threading.RLock() # an RLock: the hook may run in a signal handler on the thread that holds it ( Progress( timer = True ) )
+        self._node_class = type( 'Node(%s)' % ( ', '.join( names ), ), ( _Node, ), { '__slots__' : names } )
+
+        self._root = self._node_class( self, None, None )
+
+    def child( self, label = None ):
+        """ a new top-level node """
+
+        return self._root.child( label )
+
+    def totals( self ):
+        """ { name : total } over the whole tree """
+
+        with self._lock :
+            return dict( zip( self._names, self._root._totals() ) )
+
+    def __call__( self, fields, now ):
+
+        names = self._names
+        root = self._root
+
+        with self._lock :
+            totals = root._totals()
+            children = [ ( child._label, dict( zip( names, child._totals() ) ) ) for child in root._children or () ]
+
+        fields.update( zip( names, totals ) )
+        fields[ 'children' ] = sorted( children )
+
+
+## --------------------------------------------------------------------------
+## --------------------------------------------------------------------------
+
+# a test
+if __name__ == '__main__' :
+
+    import sys
+    from time import sleep
+
+    import progress
+
+    def func( files = 0, bytes = 0, children = () ):
+        print >>sys.stderr, "\tprogress: %d files, %d bytes" % ( files, bytes )
+        for label, totals in children :
+            print >>sys.stderr, "\t\t%s: %d files, %d bytes" % ( label, totals[ 'files' ], totals[ 'bytes' ] )
+
+    jobs = Tree( ('files', 'bytes') )
+    p = progress.Progress( func, sleep = 0.5, hooks = [ jobs ] )
+
+    def stage( label, nfiles ):
+
+        s = jobs.child( label )
+        for i in xrange( nfiles ):
+            with s.child( i ) as f :
+                for chunk in xrange( 10 ):
+                    f.bytes += 100
+                    sleep( 0.001 )
+                f.files = 1
+        s.done()
+
+    stages = [ threading.Thread( target = stage, args = ( 'stage %d' % ( i, ), 50 * ( i + 1 ) ) ) for i in xrange( 3 ) ]
+    for t in stages: t.start()
+    for t in stages: t.join()
+
+    p._join()
+
+    print >>sys.stderr, jobs.totals()
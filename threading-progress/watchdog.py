@@ -0,0 +1,142 @@
+#!/usr/bin/python
+
+"""
+
+    A stall watchdog for a Progress ( either module, progress or progress2 ): a hook that watches
+    a counter field, and when it has not changed for 'intervals' reports in a row, logs the stacks
+    of the worker threads -- once per stall -- and calls an escalation function, if any :
+
+    import progress, watchdog
+
+    def page_someone( stall ): ... # { 'field', 'value', 'since', 'seconds', 'stacks' }
+
+    dog = watchdog.Watchdog( 'count', intervals = 30, escalate = page_someone )
+    dog.register() # dump this thread only ( by default: all the threads but the reporting one )
+
+    reporter = progress.Progress( print_progress, hooks = [ dog ] )
+
+    While the counter moves, a report costs one comparison; the function may ask for
+    the field 'stalled' ( seconds since the counter last changed, 0 while it moves ) .
+
+"""
+
+import sys
+import traceback
+
+from sampler import _Threads # the registered threads, or all the others
+
+
+## --------------------------------------------------------------------------
+
+def _stacks( names ):
+    """ { thread name : formatted stack } for the threads in 'names' ( ident => name ) """
+
+    frames = sys._current_frames()
+    try:
+        return dict(  ( names[ ident ], ''.join( traceback.format_stack( frame ) ) )
+                      for ident, frame in frames.items() if ident in names  )
+    finally:
+        del frames # the frames keep their locals alive
+
+
+class Watchdog:
+    """ a Progress hook: detects that the 'field' is stuck for 'intervals' reports """
+
+    def __init__( self, field = 'count', intervals = 10, escalate = None, stream = None ):
+        """ 'escalate( stall )' is called once per stall, from the reporting thread ( see the module doc for 'stall' ) """
+
+        self._field = field
+        self._intervals = intervals
+        self._escalate = escalate
+        self._stream = stream
+
+        self._threads = _Threads()
+
+        self._value = None
+        self._since = None # when the value changed the last time
+        self._same = 0 # the reports since then
+        self._reported = False # this stall is logged already
+
+        self.stalls = 0 # statistics
+
+    def register( self, thread = None ):
+        """ dump 'thread' ( the current one by default ) on a stall; once a thread is registered, the others are not dumped """
+
+        self._threads.register( thread )
+
+    def __call__( self, fields, now ):
+
+        value = fields.get( self._field )
+
+        if value != self._value or self._since is None :
+            if self._reported :
+                self._log( "progress watchdog: '%s' moved again after %.1f s stalled [%r -> %r]\n" % ( self._field, now - self._since, self._value, value ) )
+
+            self._value = value
+            self._since = now
+            self._same = 0
+            self._reported = False
+            fields[ 'stalled' ] = 0
+            return
+
+        # else ... the same value
+        self._same += 1
+        fields[ 'stalled' ] = now - self._since
+
+        if self._same >= self._intervals and not self._reported :
+            self._reported = True
+            self.stalls += 1
+            self._stall( now )
+
+    def _stall( self, now ):
+
+        stall = { 'field' : self._field, 'value' : self._value, 'since' : self._since,
+                  'seconds' : now - self._since, 'stacks' : _stacks( self._threads.names() ) }
+
+        out = [ "progress watchdog: '%(field)s' stuck at %(value)r for %(seconds).1f s, the stacks:\n" % stall ]
+        for name, stack in sorted( stall[ 'stacks' ].items() ) :
+            out.append( "--- thread '%s':\n%s" % ( name, stack ) )
+        self._log( ''.join( out ) )
+
+        if self._escalate is not None :
+            self._escalate( stall ) # an exception goes to the hook's caller, which logs it
+
+    def _log( self, text ):
+
+        stream = self._stream if self._stream is not None else sys.stderr
+        stream.write( text )
+        stream.flush()
+
+
+## --------------------------------------------------------------------------
+## --------------------------------------------------------------------------
+
+# a test
+if __name__ == '__main__' :
+
+    from time import sleep
+
+    import progress2
+
+    def func( count = 0, stalled = 0 ):
+        print >>sys.stderr, "\tprogress: %d ( stalled for %.1f s )" % ( count, stalled )
+
+    def escalate( stall ):
+        print >>sys.stderr, "\t>> escalated: %d thread(s) dumped" % ( len( stall[ 'stacks' ] ), )
+
+    dog = Watchdog( 'count', intervals = 3, escalate = escalate )
+    dog.register()
+
+    p = progress2.Progress( func, sleep = 0.2, hooks = [ dog ] )
+
+    def stuck():
+        sleep( 1.5 ) # e.g. a network call that hangs
+
+    for i in xrange( 10 ):
+        if i == 5 :
+            stuck()
+        with p:
+            p.count = i
+        sleep( 0.1 )
+
+    p._join()